@@ -1,142 +1,239 @@
 from flask import Flask, render_template, jsonify, request, Response, send_file, redirect, url_for, flash, session
-import threading
 import time
 import json
 import os
-import queue
 import logging
 from datetime import datetime
 from scraper.engine import ScraperEngine
+from scraper.pool import BrowserPool
+from scraper.pipeline import ScrapePipeline
+from scraper.tiling import GeoTiler, RESULT_CAP
+from scraper.journal import JobJournal
+from scraper.cache import PlaceCache
+from scraper.ratelimit import DomainRateLimiter
+from scraper.analyzer import WebsiteAnalyzer
+from scraper.httpcache import HttpCache
+from scraper.httpclient import HttpClient
 from data.exporter import DataExporter
 import auth
+from jobs import Job, JobManager, JobLogHandler, default_workers, new_stats
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'nebula_crest_secret_key_2024')  # Load from env
 
-# Global state
-scraper_thread = None
-current_engine = None
-stop_event = threading.Event()
-log_queue = queue.Queue()
-
-# ... (existing code) ...
-
-
-current_stats = {
-    'total': 0,
-    'with_website': 0,
-    'no_website': 0,
-    'with_phone': 0,
-    'no_phone': 0,
-    'with_social': 0,
-    'with_pixels': 0,
-    'with_email': 0,
-    'status': 'Idle',
-    'progress': 0
-}
-
-# Configure logging to queue
-class QueueHandler(logging.Handler):
-    def emit(self, record):
-        log_entry = self.format(record)
-        log_queue.put(log_entry)
+# 'dom' opens each place page, 'click' opens its panel beside the results list,
+# 'network' reads listings from the Maps JSON payloads (experimental: see fixtures/maps/README.md)
+EXTRACTION_MODE = os.environ.get('EXTRACTION_MODE', 'dom')
+
+# Resources Chrome doesn't download: 'off', 'media' (images/fonts/video) or 'maps' (also tiles and analytics).
+# Off by default until benchmarks/bench_page_load.py has confirmed the feed and place panel still load
+BLOCK_RESOURCES = os.environ.get('BLOCK_RESOURCES', 'off')
+
+# 'eager' / 'none' hand control back before the page finishes loading; readiness checks take over.
+# 'normal' by default until benchmarks/bench_detail_modes.py has been run against live Maps
+PAGE_LOAD_STRATEGY = os.environ.get('PAGE_LOAD_STRATEGY', 'normal')
+
+# Jobs asking for more listings than one Maps search returns are split into map tiles
+TILE_SEARCH_ABOVE = int(os.environ.get('TILE_SEARCH_ABOVE', RESULT_CAP))
+
+# Browsers one job holds for its whole run: its own plus the extra detail (or tile) workers
+DETAIL_WORKERS = max(int(os.environ.get('DETAIL_WORKERS', 1)), 1)
+TILE_WORKERS = max(int(os.environ.get('TILE_WORKERS', 1)), 1)
+JOB_BROWSERS = max(DETAIL_WORKERS, TILE_WORKERS)
+
+# Scrapes run side by side, at most this many at once (default: what CPU and free memory allow)
+MAX_CONCURRENT_JOBS = int(os.environ.get('MAX_CONCURRENT_JOBS', 0)) or \
+    default_workers(int(os.environ.get('BROWSER_MAX_RSS_MB', 1500)) * JOB_BROWSERS)
+
+# Warm headless browsers shared by jobs; never fewer than every concurrent job can hold at once,
+# or a job whose browsers another job's extra workers took would block in acquire() until it times out
+browser_pool = BrowserPool(
+    size=max(int(os.environ.get('BROWSER_POOL_SIZE', 0)), MAX_CONCURRENT_JOBS * JOB_BROWSERS),
+    headless=True,
+    max_pages=int(os.environ.get('BROWSER_MAX_PAGES', 300)),
+    max_rss_mb=int(os.environ.get('BROWSER_MAX_RSS_MB', 1500)),
+    network_capture=EXTRACTION_MODE == 'network',
+    block_resources=BLOCK_RESOURCES,
+    page_load_strategy=PAGE_LOAD_STRATEGY
+)
+browser_pool.start()
+
+# Place details from earlier runs; fresh entries skip the place page entirely
+place_cache = PlaceCache(
+    os.environ.get('PLACE_CACHE_DB', os.path.join('cache', 'places.db')),
+    ttl=float(os.environ.get('PLACE_CACHE_TTL_HOURS', 168)) * 3600
+)
+
+# One Maps rate limit for every engine of every job, tile workers included
+maps_rate_limiter = DomainRateLimiter(rate=float(os.environ.get('MAPS_RATE_LIMIT', 2.0)))
+
+# Checkpoints of every job's collected URLs and finished records, for resuming after a crash or stop
+job_journal = JobJournal(os.environ.get('JOBS_DB', os.path.join('cache', 'jobs.db')))
+
+# One pooled HTTP client (keep-alive connections, DNS cache, retries) for all outbound website fetches
+http_client = HttpClient(
+    max_connections=int(os.environ.get('HTTP_MAX_CONNECTIONS', 50)),
+    per_host=int(os.environ.get('HTTP_PER_HOST', 2)),
+    timeout=float(os.environ.get('HTTP_TIMEOUT', 10)),
+    retries=int(os.environ.get('HTTP_RETRIES', 2))
+)
+
+# One website analyzer shared across jobs, backed by an HTTP cache
+website_analyzer = WebsiteAnalyzer(
+    client=http_client,
+    http_cache=HttpCache(
+        os.environ.get('HTTP_CACHE_DB', os.path.join('cache', 'http.db')),
+        fresh_for=float(os.environ.get('HTTP_CACHE_FRESH_HOURS', 24)) * 3600
+    ),
+    max_bytes=int(os.environ.get('WEBSITE_MAX_KB', 2048)) * 1024,
+    crawl_budget=int(os.environ.get('CONTACT_CRAWL_PAGES', 3))
+)
 
 logger = logging.getLogger('NebulaScraper')
 logger.setLevel(logging.INFO)
-queue_handler = QueueHandler()
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
-queue_handler.setFormatter(formatter)
-logger.addHandler(queue_handler)
 
-def run_scraper(keyword, location, max_results, headless, no_website=False):
-    global current_stats, stop_event, current_engine
+def _set_status(job, status):
+    job.status = status
+    job_journal.set_status(job.id, status)
+
+def run_scraper(job):
+    keyword, location, max_results = job.keyword, job.location, job.max_results
+    headless, no_website = job.headless, job.no_website
+    log = job.log
+    _set_status(job, 'running')
     
     try:
-        current_stats['status'] = 'Initializing...'
-        current_stats['progress'] = 5
-        logger.info(f"Starting scrape for '{keyword}' in '{location}'")
+        job.stats['status'] = 'Initializing...'
+        job.stats['progress'] = 5
+        log.info(f"Starting scrape for '{keyword}' in '{location}'")
         
         # Check if stop was requested
-        if stop_event.is_set():
-            current_stats['status'] = 'Aborted'
+        if job.stop_event.is_set():
+            job.stats['status'] = 'Aborted'
+            _set_status(job, 'stopped')
             return
 
-        engine = ScraperEngine(headless=headless)
-        current_engine = engine
+        # Headless jobs take a warm browser from the pool; visible ones still launch fresh
+        def make_engine(acquire_timeout=None):
+            return ScraperEngine(
+                headless=headless,
+                pool=browser_pool if headless else None,
+                detail_workers=DETAIL_WORKERS,
+                rate_limiter=maps_rate_limiter,
+                scroll_idle_timeout=float(os.environ.get('SCROLL_IDLE_TIMEOUT', 10)),
+                place_cache=place_cache,
+                analyzer=website_analyzer,
+                extraction=EXTRACTION_MODE,
+                block_resources=BLOCK_RESOURCES,
+                page_load_strategy=PAGE_LOAD_STRATEGY,
+                acquire_timeout=acquire_timeout
+            )
+
+        engine = make_engine()
+        job.engine = engine
         
-        current_stats['status'] = 'Searching...'
-        current_stats['progress'] = 10
+        job.stats['status'] = 'Searching...'
+        job.stats['progress'] = 10
         if not engine.search(keyword, location):
-            logger.error("Search failed")
-            current_stats['status'] = 'Error'
+            log.error("Search failed")
+            job.stats['status'] = 'Error'
+            _set_status(job, 'failed')
             return
 
         # Check if stop was requested
-        if stop_event.is_set():
-            current_stats['status'] = 'Aborted'
+        if job.stop_event.is_set():
+            job.stats['status'] = 'Aborted'
+            _set_status(job, 'stopped')
             engine.close()
             return
 
         # Phase 1 & 2: Collect & Extract (Smart Mode or Normal Mode)
         if no_website:
-            logger.info(f"Smart Filtering Enabled: Searching for {max_results} businesses without websites...")
-            current_stats['status'] = 'Smart Filtering...'
+            log.info(f"Smart Filtering Enabled: Searching for {max_results} businesses without websites...")
+            job.stats['status'] = 'Smart Filtering...'
             
             def no_website_filter(data):
                 # Return True if NO website
                 return not data.get('Website') or data.get('Website').strip() == ''
+            
+            def no_website_card_filter(card):
+                # A "Website" button on the listing card rules it out without opening the place page
+                return not card.get('has_website')
                 
             results = engine.scrape_with_filter(
                 keyword, 
                 location, 
                 max_results, 
                 filter_func=no_website_filter,
-                should_stop=lambda: stop_event.is_set()
+                should_stop=lambda: job.stop_event.is_set(),
+                card_filter=no_website_card_filter
             )
-            logger.info(f"Smart Filter Complete: Found {len(results)} businesses")
+            log.info(f"Smart Filter Complete: Found {len(results)} businesses")
             
         else:
-            current_stats['status'] = 'Collecting URLs...'
-            current_stats['progress'] = 20
-            logger.info("Scrolling to find businesses...")
-            
-            # Phase 1: Collect
-            elements = engine.scroll_and_collect(max_results, should_stop=lambda: stop_event.is_set())
-            logger.info(f"Found {len(elements)} businesses to process")
+            job.stats['status'] = 'Collecting URLs...'
+            job.stats['progress'] = 20
+            log.info("Scrolling to find businesses...")
             
-            # Check if stop was requested
-            if stop_event.is_set():
-                current_stats['status'] = 'Aborted'
-                engine.close()
-                return
+            # Phase 1 & 2: collector -> detail -> website analyzer -> exporter, run as a staged pipeline
+            def on_record(business):
+                job.stats['total'] += 1
+                job.stats['status'] = 'Extracting Data...'
+                job.stats['progress'] = min(30 + int(60 * job.stats['total'] / max(max_results, 1)), 89)
+                job.stats['pipeline'] = pipeline.stats()
             
-            current_stats['status'] = 'Extracting Data...'
-            current_stats['progress'] = 30
-            
-            # Phase 2: Extract
-            results = engine.extract_details(elements, keyword, location, should_stop=lambda: stop_event.is_set())
+            # One search caps out around 120 listings; bigger jobs search the area tile by tile
+            urls = None
+            if max_results > TILE_SEARCH_ABOVE and not job_journal.urls(job.id):
+                job.stats['status'] = 'Searching map tiles...'
+                tiler = GeoTiler(
+                    engine, keyword, location, max_results,
+                    workers=TILE_WORKERS,
+                    # Extra tile workers only take browsers that are free soon; the tiler runs with fewer otherwise
+                    engine_factory=lambda: make_engine(acquire_timeout=10),
+                    should_stop=lambda: job.stop_event.is_set()
+                )
+                urls = [card['url'] for card in tiler.run()]
+                log.info(f"Tiled search found {len(urls)} unique listings in {tiler.stats['tiles']} tiles")
+
+            pipeline = ScrapePipeline(
+                engine, keyword, location, max_results,
+                should_stop=lambda: job.stop_event.is_set(),
+                on_record=on_record,
+                analyzer_workers=int(os.environ.get('ANALYZER_WORKERS', 8)),
+                urls=urls,
+                journal=job_journal,
+                job_id=job.id
+            )
+            results = pipeline.run()
+            job.stats['pipeline'] = pipeline.stats()
+            log.info(f"Pipeline finished: {len(results)} businesses extracted")
+        
+        cache_stats = place_cache.stats()
+        log.info(f"Place cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses so far")
         
         # Update final stats
-        current_stats['total'] = len(results)
-        current_stats['with_website'] = sum(1 for b in results if b.get('Website'))
-        current_stats['no_website'] = len(results) - current_stats['with_website']
-        current_stats['with_phone'] = sum(1 for b in results if b.get('Phone'))
-        current_stats['no_phone'] = len(results) - current_stats['with_phone']
+        job.stats['total'] = len(results)
+        job.stats['with_website'] = sum(1 for b in results if b.get('Website'))
+        job.stats['no_website'] = len(results) - job.stats['with_website']
+        job.stats['with_phone'] = sum(1 for b in results if b.get('Phone'))
+        job.stats['no_phone'] = len(results) - job.stats['with_phone']
         
         # New v6.0 Stats
-        current_stats['with_social'] = sum(1 for b in results if any(b.get(k) for k in ['Social_Facebook', 'Social_Instagram', 'Social_LinkedIn', 'Social_Twitter']))
-        current_stats['with_pixels'] = sum(1 for b in results if b.get('Ad_Pixel_FB') == 'Yes' or b.get('Ad_Pixel_Google') == 'Yes')
-        current_stats['with_email'] = sum(1 for b in results if b.get('Email') or b.get('Email_Found'))
+        job.stats['with_social'] = sum(1 for b in results if any(b.get(k) for k in ['Social_Facebook', 'Social_Instagram', 'Social_LinkedIn', 'Social_Twitter']))
+        job.stats['with_pixels'] = sum(1 for b in results if b.get('Ad_Pixel_FB') == 'Yes' or b.get('Ad_Pixel_Google') == 'Yes')
+        job.stats['with_email'] = sum(1 for b in results if b.get('Email') or b.get('Email_Found'))
         
         # Check if stop was requested
-        if stop_event.is_set():
-            current_stats['status'] = 'Aborted'
+        if job.stop_event.is_set():
+            job.stats['status'] = 'Aborted'
+            _set_status(job, 'stopped')
             engine.close()
             return
 
         # Export
-        current_stats['status'] = 'Exporting...'
-        current_stats['progress'] = 90
+        job.stats['status'] = 'Exporting...'
+        job.stats['progress'] = 90
         
         exporter = DataExporter()
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -149,19 +246,27 @@ def run_scraper(keyword, location, max_results, headless, no_website=False):
         
         filepath = os.path.join(output_dir, f"{filename}.xlsx")
         exporter.export_to_excel(results, filepath)
-        logger.info(f"Exported to: {filepath}")
+        log.info(f"Exported to: {filepath}")
         
-        current_stats['status'] = 'Completed'
-        current_stats['progress'] = 100
-        logger.info("Scraping finished successfully")
+        job.stats['status'] = 'Completed'
+        job.stats['progress'] = 100
+        _set_status(job, 'completed')
+        log.info("Scraping finished successfully")
         
     except Exception as e:
-        logger.error(f"Scraping error: {str(e)}")
-        current_stats['status'] = 'Error'
+        log.error(f"Scraping error: {str(e)}")
+        job.stats['status'] = 'Error'
+        _set_status(job, 'failed')
+        log.info(f"Resume this job with POST /api/jobs/{job.id}/resume")
     finally:
         if 'engine' in locals():
             engine.close()
-        current_engine = None
+
+job_manager = JobManager(run_scraper, workers=MAX_CONCURRENT_JOBS)
+job_log_handler = JobLogHandler(job_manager)
+job_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S'))
+logger.addHandler(job_log_handler)
+job_manager.start()
 
 @app.route('/')
 def index():
@@ -204,17 +309,13 @@ def logout():
 
 @app.route('/api/start', methods=['POST'])
 def start_scraping():
-    global scraper_thread, stop_event, current_stats
-    
-    if scraper_thread and scraper_thread.is_alive():
-        return jsonify({'error': 'Scraper is already running'}), 400
-        
     data = request.json
     keyword = data.get('keyword')
     location = data.get('location')
     max_results = int(data.get('max_results', 10))
     headless = data.get('headless', True)
     no_website = data.get('no_website', False)
+    priority = int(data.get('priority', 0))
     
     # Validate license-based max_results limit
     if 'features' in session:
@@ -224,49 +325,154 @@ def start_scraping():
                 'error': f'Maximum results exceeded. Your license allows up to {license_max} results.'
             }), 400
     
-    # Reset stats
-    current_stats = {k: 0 for k in current_stats if k != 'status'}
-    current_stats['status'] = 'Starting...'
-    
-    stop_event.clear()
-    scraper_thread = threading.Thread(
-        target=run_scraper,
-        args=(keyword, location, max_results, headless, no_website)
-    )
-    scraper_thread.daemon = True
-    scraper_thread.start()
+    owner, weight, max_running = _license_quota()
+    job_id = job_journal.create_job(keyword, location, max_results,
+                                    {'headless': headless, 'no_website': no_website}, owner=owner)
+    job = Job(job_id, keyword, location, max_results, headless, no_website, priority,
+              owner=owner, weight=weight, max_running=max_running, logger=logger)
+    return _submit(job, 'started')
+
+def _license_quota():
+    """(owner, worker share, concurrent job cap) of the session's license; sessions without one share a single slot."""
+    license_key = session.get('license_key')
+    features = auth.validate_license_key(license_key).get('features', {}) if license_key else {}
+    return license_key, features.get('worker_share', 1), features.get('max_concurrent_jobs', 1)
+
+def _session_job(job_id):
+    """The live job if it belongs to the session's license, else None."""
+    job = job_manager.get(job_id)
+    if job is None or job.owner != session.get('license_key'):
+        return None
+    return job
+
+def _submit(job, status):
+    _set_status(job, 'queued')
+    position = job_manager.submit(job)
+    # The dashboard's legacy /api/stats, /api/stop and /api/logs follow the session's latest job
+    session['job_id'] = job.id
+    job.log.info(f"Job {job.id} queued at position {position}" if position else f"Job {job.id} started")
+    return jsonify({'status': status, 'job_id': job.id, 'position': position})
+
+@app.route('/api/jobs')
+def list_jobs():
+    # The license's journaled jobs, with live progress for the ones this server is running or queueing
+    owner = session.get('license_key')
+    jobs = job_journal.jobs(int(request.args.get('limit', 20)), owner=owner)
+    for row in jobs:
+        del row['owner']
+        job = job_manager.get(row['job_id'])
+        if job is not None:
+            row.update(_job_status(job))
+    return jsonify({'jobs': jobs, **job_manager.stats(owner)})
+
+@app.route('/api/queue')
+def get_queue():
+    # Where the license's waiting jobs stand in the shared queue, and its quota
+    owner, weight, max_running = _license_quota()
+    return jsonify({
+        'jobs': [{'job_id': job.id, 'position': position, 'keyword': job.keyword, 'location': job.location}
+                 for position, job in job_manager.queue(owner)],
+        'quota': {'max_concurrent_jobs': max_running, 'worker_share': weight},
+        **job_manager.stats(owner)
+    })
+
+def _job_status(job):
+    status = job.summary()
+    status['position'] = job_manager.position(job.id)
+    return status
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    job = _session_job(job_id)
+    if job is not None:
+        return jsonify(_job_status(job))
+    record = job_journal.get_job(job_id)
+    if record is None or record.pop('owner') != session.get('license_key'):
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(record)
+
+@app.route('/api/jobs/<job_id>/stop', methods=['POST'])
+def stop_job(job_id):
+    job = _session_job(job_id)
+    if job is None or job.finished:
+        return jsonify({'error': 'Job is not running'}), 400
+    was_queued = job.status == 'queued'
+    job_manager.stop(job_id)
+    if was_queued:
+        _set_status(job, 'stopped')
+    return jsonify({'status': 'stopped' if was_queued else 'stopping', 'job_id': job_id})
+
+@app.route('/api/jobs/<job_id>/logs')
+def stream_job_logs(job_id):
+    job = _session_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    # EventSource reconnects send the last id they saw, so a dropped stream resumes without repeats
+    try:
+        since = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+    except ValueError:
+        return jsonify({'error': "'since' must be a log line number"}), 400
+    return Response(_log_stream(job, since), mimetype='text/event-stream')
+
+def _log_stream(job, seq=0):
+    while True:
+        lines = job.logs_since(seq)
+        for seq, line in lines:
+            yield f"id: {seq}\ndata: {line}\n\n"
+        if not lines:
+            if job.finished:
+                return
+            yield "data: \n\n"
+            time.sleep(0.5)
+
+@app.route('/api/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    owner, weight, max_running = _license_quota()
+    record = job_journal.get_job(job_id)
+    if record is None or record['owner'] != owner:
+        return jsonify({'error': 'Unknown job'}), 404
+    live = job_manager.get(job_id)
+    if live is not None and not live.finished:
+        return jsonify({'error': f'Job is already {live.status}'}), 400
+    if record['status'] == 'completed':
+        return jsonify({'error': 'Job already completed'}), 400
     
-    return jsonify({'status': 'started'})
+    options = record['options']
+    job = Job(job_id, record['keyword'], record['location'], record['max_results'],
+              options.get('headless', True), options.get('no_website', False),
+              owner=owner, weight=weight, max_running=max_running, logger=logger)
+    return _submit(job, 'resumed')
 
 @app.route('/api/stop', methods=['POST'])
 def stop_scraping():
-    global stop_event, current_engine
-    stop_event.set()
-    
-    # Force kill the engine if it exists
-    if current_engine:
-        try:
-            current_engine.close()
-        except:
-            pass
-            
-    return jsonify({'status': 'stopping'})
+    job = _session_job(session.get('job_id'))
+    if job is None or job.finished:
+        return jsonify({'error': 'No job running'}), 400
+    return stop_job(job.id)
 
 @app.route('/api/stats')
 def get_stats():
-    return jsonify(current_stats)
+    job = _session_job(session.get('job_id'))
+    if job is None:
+        stats = new_stats()
+        stats['status'] = 'Idle'
+        return jsonify(stats)
+    return jsonify(dict(job.stats, job_id=job.id, position=job_manager.position(job.id)))
+
+@app.route('/api/pool')
+def get_pool_stats():
+    return jsonify(browser_pool.stats())
+
+@app.route('/api/cache')
+def get_cache_stats():
+    return jsonify({'places': place_cache.stats(), 'http': website_analyzer.http_cache.stats()})
 
 @app.route('/api/logs')
 def stream_logs():
-    def generate():
-        while True:
-            try:
-                log_entry = log_queue.get(timeout=1)
-                yield f"data: {log_entry}\n\n"
-            except queue.Empty:
-                yield f"data: \n\n"
-                time.sleep(0.5)
-    return Response(generate(), mimetype='text/event-stream')
+    job = _session_job(session.get('job_id'))
+    if job is None:
+        return Response("data: \n\n", mimetype='text/event-stream')
+    return Response(_log_stream(job), mimetype='text/event-stream')
 
 if __name__ == '__main__':
     # Open browser automatically to license page
@@ -72,7 +72,9 @@ def validate_license_key(license_key):
             'features': {
                 'max_results': -1,  # Unlimited
                 'advanced_features': True,
-                'priority_support': True
+                'priority_support': True,
+                'max_concurrent_jobs': 4,  # Scrapes running at once
+                'worker_share': 3  # Fair-share weight when jobs queue for workers
             }
         }
     elif formatted_key in CLIENT_LICENSE_KEYS:
@@ -83,7 +85,9 @@ def validate_license_key(license_key):
             'features': {
                 'max_results': 1000,  # Standard limit
                 'advanced_features': True,
-                'priority_support': False
+                'priority_support': False,
+                'max_concurrent_jobs': 2,
+                'worker_share': 1
             }
         }
     else:
@@ -0,0 +1,83 @@
+"""
+Benchmark the ways of getting place details for a page of search results.
+
+Runs one search, then extracts the same listings three ways and reports
+seconds per listing and how many names agree with the 'navigate' baseline:
+
+    navigate  driver.get() each place page in the same tab (fetch_details)
+    tab       open each place page in a new tab (scrape_with_filter)
+    click     click each card and read the in-place panel (extraction='click')
+
+The place cache and rate limiter are disabled so only page handling is timed.
+
+Usage:
+    python benchmarks/bench_detail_modes.py ["dentist" "Boston"] [--listings N] [--visible]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.engine import ScraperEngine
+from scraper.pool import apply_resource_blocking
+
+
+def navigate(engine, urls, keyword, location):
+    return [engine.fetch_details(url, keyword, location) for url in urls]
+
+
+def new_tab(engine, urls, keyword, location):
+    records = []
+    for url in urls:
+        engine.driver.execute_script("window.open('');")
+        engine.driver.switch_to.window(engine.driver.window_handles[-1])
+        apply_resource_blocking(engine.driver, engine.block_resources)
+        try:
+            records.append(engine.fetch_details(url, keyword, location))
+        finally:
+            engine.driver.close()
+            engine.driver.switch_to.window(engine.driver.window_handles[0])
+    return records
+
+
+def click(engine, urls, keyword, location):
+    return [engine.click_details(url, keyword, location) for url in urls]
+
+
+MODES = {'navigate': navigate, 'tab': new_tab, 'click': click}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('keyword', nargs='?', default='dentist')
+    parser.add_argument('location', nargs='?', default='Boston')
+    parser.add_argument('--listings', type=int, default=10)
+    parser.add_argument('--visible', action='store_true')
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'mode':<9} {'total s':>8} {'s/listing':>10} {'names agree':>12}")
+    for mode, run in MODES.items():
+        # A fresh search per mode so every mode starts from the same results list
+        engine = ScraperEngine(headless=not args.visible, maps_rate_limit=0)
+        try:
+            if not engine.search(args.keyword, args.location):
+                sys.exit("Search failed")
+            urls = [card['url'] for card in engine.harvest_cards()][:args.listings]
+            start = time.perf_counter()
+            records = run(engine, urls, args.keyword, args.location)
+            elapsed = time.perf_counter() - start
+        finally:
+            engine.close()
+
+        names = [(r or {}).get('Business Name', '') for r in records]
+        baseline = baseline or names
+        agree = sum(1 for a, b in zip(names, baseline) if a and a == b)
+        print(f"{mode:<9} {elapsed:8.1f} {elapsed / max(len(urls), 1):10.2f} {agree:>7}/{len(urls)}")
+
+
+if __name__ == '__main__':
+    main()
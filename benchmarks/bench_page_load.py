@@ -0,0 +1,80 @@
+"""
+Benchmark Maps page loads with each resource blocking profile.
+
+For every profile, launches a headless driver, opens a Maps search and then
+a place page from its results, and reports time until the results feed /
+place heading is present plus the bytes transferred (summed from the
+DevTools Network.loadingFinished events in the performance log).
+
+Usage:
+    python benchmarks/bench_page_load.py ["dentist in Boston"] [--repeat N] [--profiles off,media,maps]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from scraper.pool import create_driver, BLOCKING_PROFILES
+
+
+def transferred_bytes(driver):
+    """Bytes received since the last call, from the performance log."""
+    total = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message.get('method') == 'Network.loadingFinished':
+            total += message['params'].get('encodedDataLength', 0)
+    return total
+
+
+def timed_load(driver, url, selector, timeout=30):
+    transferred_bytes(driver)
+    start = time.perf_counter()
+    driver.get(url)
+    WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+    elapsed = time.perf_counter() - start
+    # Let trailing requests (tiles, photos) land so they are counted
+    time.sleep(2)
+    return elapsed, transferred_bytes(driver)
+
+
+def bench(profile, query, repeat):
+    driver = create_driver(headless=True, network_capture=True, block_resources=profile)
+    search_url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
+    results = {'search': [], 'place': []}
+    try:
+        for _ in range(repeat):
+            driver.delete_all_cookies()
+            results['search'].append(timed_load(driver, search_url, "div[role='feed']"))
+            place = driver.find_element(By.CSS_SELECTOR, 'a.hfpxzc').get_attribute('href')
+            results['place'].append(timed_load(driver, place, 'h1'))
+    finally:
+        driver.quit()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('query', nargs='?', default='dentist in Boston')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--profiles', default=','.join(BLOCKING_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'page':<7} {'mean s':>8} {'best s':>8} {'mean KB':>9}")
+    for profile in args.profiles.split(','):
+        for page, loads in bench(profile, args.query, args.repeat).items():
+            times = [t for t, _ in loads]
+            sizes = [b for _, b in loads]
+            print(f"{profile:<8} {page:<7} {sum(times) / len(times):8.2f} {min(times):8.2f} "
+                  f"{sum(sizes) / len(sizes) / 1024:9.0f}")
+
+
+if __name__ == '__main__':
+    main()
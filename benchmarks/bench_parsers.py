@@ -0,0 +1,86 @@
+"""
+Benchmark the website-analysis parser backends on large homepages.
+
+Measures wall time per parse and peak Python heap allocation (tracemalloc)
+for every available backend, on a synthetic ~2MB page or on HTML files
+given on the command line.
+
+Usage:
+    python benchmarks/bench_parsers.py [page.html ...] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.analyzer import parse_website, empty_analysis
+from scraper.parsers import PARSER_BACKENDS
+
+
+def synthetic_homepage(sections=4000):
+    """A bloated but realistic homepage: inline scripts, nav links, repeated content blocks."""
+    head = (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        '<title>Acme Dental | Family Dentist in Boston</title>'
+        '<meta name="description" content="Gentle family dentistry in downtown Boston.">'
+        '<script>!function(f,b,e,v,n,t,s){}(window,document,"script","https://connect.facebook.net/en_US/fbevents.js");fbq("init","1");</script>'
+        '<script async src="https://www.googletagmanager.com/gtag/js?id=G-XYZ"></script>'
+        '</head><body>'
+    )
+    block = (
+        '<section class="card"><h2>Service {i}</h2><p>Lorem ipsum dolor sit amet, consectetur '
+        'adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.</p>'
+        '<a href="/services/{i}">Read more</a><img src="/img/{i}.jpg" alt="service {i}"></section>'
+    )
+    foot = (
+        '<footer><a href="https://facebook.com/acme">Facebook</a>'
+        '<a href="https://instagram.com/acme">Instagram</a>'
+        '<a href="mailto:hello@acme.example">Email us</a></footer></body></html>'
+    )
+    return head + ''.join(block.format(i=i) for i in range(sections)) + foot
+
+
+def bench(backend, html, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse_website(html, empty_analysis(), backend=backend)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse_website(html, empty_analysis(), backend=backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), sum(times) / len(times), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', help='HTML files to parse (default: synthetic 2MB page)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = [(path, open(path, encoding='utf-8', errors='replace').read()) for path in args.pages]
+    if not pages:
+        pages = [('synthetic', synthetic_homepage())]
+
+    for name, html in pages:
+        print(f"\n{name}: {len(html) / 1024:.0f} KB")
+        print(f"{'backend':<12} {'best ms':>9} {'mean ms':>9} {'peak MB':>9}  title / pixels / viewport")
+        baseline = None
+        for backend in PARSER_BACKENDS:
+            best, mean, peak, result = bench(backend, html, args.repeat)
+            baseline = baseline or result
+            agrees = '' if result == baseline else '  (differs from bs4!)'
+            print(f"{backend:<12} {best * 1000:9.1f} {mean * 1000:9.1f} {peak / 2**20:9.2f}  "
+                  f"{result['SEO_Title'][:30]!r} / {result['Ad_Pixel_FB']},{result['Ad_Pixel_Google']} / "
+                  f"{result['Mobile_Friendly']}{agrees}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+"""
+Job manager for running several scrapes concurrently in one server.
+
+Every scrape is a Job with its own ID, stop event, engine, stats and log
+buffer. Submitted jobs wait until one of a bounded set of worker threads
+picks them up; the number of workers defaults to what the machine's CPU and
+free memory can carry.
+
+Workers are shared fairly between owners (license keys): each owner has a
+concurrency cap and a weight, and a free worker goes to the owner using the
+smallest share of workers for its weight, so one owner with a long queue
+can't starve the others. An owner's own jobs run by priority, then FIFO.
+"""
+
+import collections
+import itertools
+import logging
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Rough peak footprint of one running job: a Chrome instance plus its driver
+JOB_MEMORY_MB = 1500
+
+# Job states; 'queued' and 'running' are live, the rest are final
+FINAL_STATES = ('completed', 'stopped', 'failed')
+
+
+def new_stats():
+    """The per-job counters the dashboard polls."""
+    return {
+        'total': 0,
+        'with_website': 0,
+        'no_website': 0,
+        'with_phone': 0,
+        'no_phone': 0,
+        'with_social': 0,
+        'with_pixels': 0,
+        'with_email': 0,
+        'status': 'Queued',
+        'progress': 0
+    }
+
+
+def default_workers(job_memory_mb=JOB_MEMORY_MB):
+    """Concurrent jobs this machine can carry: one per two CPUs, capped by available memory."""
+    by_cpu = max(1, (os.cpu_count() or 1) // 2)
+    if psutil is None:
+        return by_cpu
+    by_memory = int(psutil.virtual_memory().available / (1024 * 1024) // job_memory_mb)
+    return max(1, min(by_cpu, by_memory))
+
+
+class Job:
+    """One scrape request and everything its run needs to be watched and stopped."""
+
+    def __init__(self, job_id, keyword, location, max_results, headless=True, no_website=False,
+                 priority=0, owner=None, weight=1, max_running=-1, logger=None, log_limit=1000):
+        self.id = job_id
+        self.keyword = keyword
+        self.location = location
+        self.max_results = max_results
+        self.headless = headless
+        self.no_website = no_website
+        self.priority = priority
+        # Fair-share quota of the owner: relative share of workers, and jobs it may run at once (-1 = no cap)
+        self.owner = owner
+        self.weight = max(weight, 1)
+        self.max_running = max_running
+        self.seq = 0
+        self.status = 'queued'
+        self.stats = new_stats()
+        self.stop_event = threading.Event()
+        self.engine = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        # Log lines are numbered so a reader can ask for everything after the last line it saw
+        self.log = logging.LoggerAdapter(logger or logging.getLogger(__name__), {'job_id': job_id})
+        self._logs = collections.deque(maxlen=log_limit)
+        self._log_seq = 0
+        self._log_lock = threading.Lock()
+
+    def add_log(self, line):
+        with self._log_lock:
+            self._log_seq += 1
+            self._logs.append((self._log_seq, line))
+
+    def logs_since(self, seq=0):
+        """[(seq, line)] logged after line 'seq'; lines beyond the buffer limit are gone."""
+        with self._log_lock:
+            return [(n, line) for n, line in self._logs if n > seq]
+
+    @property
+    def finished(self):
+        return self.status in FINAL_STATES
+
+    def stop(self):
+        """Ask the run to stop and kill its browser (a pooled one is replaced with a fresh one)."""
+        self.stop_event.set()
+        if self.engine:
+            try:
+                self.engine.close(discard=True)
+            except Exception:
+                pass
+
+    def summary(self):
+        return {
+            'job_id': self.id,
+            'keyword': self.keyword,
+            'location': self.location,
+            'max_results': self.max_results,
+            'priority': self.priority,
+            'status': self.status,
+            'stats': self.stats,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobLogHandler(logging.Handler):
+    """Routes records logged through a Job's 'log' adapter into that job's log buffer."""
+
+    def __init__(self, manager):
+        super().__init__()
+        self.manager = manager
+
+    def emit(self, record):
+        job = self.manager.get(getattr(record, 'job_id', None))
+        if job is not None:
+            job.add_log(self.format(record))
+
+
+class JobManager:
+    """
+    Runs submitted jobs on 'workers' threads, shared fairly between owners.
+
+    A free worker takes a job from the owner with the fewest running jobs per
+    unit of weight that is still below its concurrency cap; ties go to the
+    owner served least recently. Within an owner, jobs run highest priority
+    first and in submission order within a priority.
+
+    'runner' is called with each Job and does the actual scrape; it should
+    set job.status to a final state. Finished jobs stay visible until more
+    than 'keep_finished' have piled up.
+    """
+
+    def __init__(self, runner, workers=None, keep_finished=100):
+        self.runner = runner
+        self.workers = workers or default_workers()
+        self.keep_finished = keep_finished
+        self._jobs = collections.OrderedDict()
+        self._pending = []
+        self._running = collections.Counter()
+        self._last_served = {}
+        self._served = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._closed = False
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            self._threads = [threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                             for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, job):
+        """Queue a job (replacing a finished one with the same ID) and return its queue position."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("JobManager is closed")
+            current = self._jobs.get(job.id)
+            if current is not None and not current.finished:
+                raise ValueError(f"Job {job.id} is already {current.status}")
+            job.seq = next(self._seq)
+            self._jobs[job.id] = job
+            self._jobs.move_to_end(job.id)
+            self._pending.append(job)
+            self._cond.notify()
+        return self.position(job.id)
+
+    def _pick(self, pending, running, last_served, capped=True):
+        """The job a free worker would take next, or None if every waiting owner is at its cap."""
+        best, best_key = None, None
+        for job in pending:
+            count = running[job.owner]
+            if capped and 0 <= job.max_running <= count:
+                continue
+            key = (count / job.weight, last_served.get(job.owner, -1), -job.priority, job.seq)
+            if best_key is None or key < best_key:
+                best, best_key = job, key
+        return best
+
+    def _order(self):
+        """
+        Waiting jobs in the order they are expected to start, assuming each
+        one keeps its worker busy until the rest have started. Jobs of owners
+        at their cap go last, in the same fair order.
+        """
+        pending, running, last_served = list(self._pending), collections.Counter(self._running), dict(self._last_served)
+        order = []
+        while pending:
+            job = self._pick(pending, running, last_served) or self._pick(pending, running, last_served, capped=False)
+            pending.remove(job)
+            running[job.owner] += 1
+            last_served[job.owner] = self._served + len(order) + 1
+            order.append(job)
+        return order
+
+    def position(self, job_id):
+        """1-based place of a queued job in the expected start order, or 0 once it is no longer waiting."""
+        with self._cond:
+            order = [job.id for job in self._order()]
+        return order.index(job_id) + 1 if job_id in order else 0
+
+    def queue(self, owner=None):
+        """(position, job) for every waiting job, optionally only those of one owner."""
+        with self._cond:
+            order = self._order()
+        return [(position, job) for position, job in enumerate(order, 1) if owner is None or job.owner == owner]
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """Every job still tracked, oldest first."""
+        with self._cond:
+            return list(self._jobs.values())
+
+    def stop(self, job_id):
+        """Stop a running job or drop a queued one. False if the job is unknown."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            if job.status == 'queued':
+                self._pending.remove(job)
+                job.status = 'stopped'
+                job.stats['status'] = 'Aborted'
+                job.finished_at = time.time()
+                return True
+        job.stop()
+        return True
+
+    def stats(self, owner=None):
+        """Worker usage overall, plus the running / queued counts of 'owner' if given."""
+        with self._cond:
+            stats = {'workers': self.workers, 'running': sum(self._running.values()), 'queued': len(self._pending)}
+            if owner is not None:
+                stats['owner_running'] = self._running[owner]
+                stats['owner_queued'] = sum(1 for job in self._pending if job.owner == owner)
+            return stats
+
+    def _next(self):
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                job = self._pick(self._pending, self._running, self._last_served)
+                if job is not None:
+                    break
+                # Nothing waiting, or every waiting owner is at its cap until one of its jobs ends
+                self._cond.wait()
+            self._pending.remove(job)
+            self._running[job.owner] += 1
+            self._served += 1
+            self._last_served[job.owner] = self._served
+            job.status = 'running'
+            job.started_at = time.time()
+            return job
+
+    def _worker(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            try:
+                self.runner(job)
+            except Exception as e:
+                job.log.error(f"Job crashed: {e}")
+                job.status = 'failed'
+            finally:
+                if not job.finished:
+                    job.status = 'stopped' if job.stop_event.is_set() else 'completed'
+                job.finished_at = time.time()
+                job.engine = None
+                with self._cond:
+                    self._running[job.owner] -= 1
+                    # A worker may be waiting on this owner's cap
+                    self._cond.notify_all()
+                self._trim()
+
+    def _trim(self):
+        with self._cond:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+            for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+                del self._jobs[job_id]
+
+    def close(self):
+        """Stop every running job, drop the queue and let the workers exit."""
+        with self._cond:
+            self._closed = True
+            self._pending = []
+            running = [job for job in self._jobs.values() if job.status == 'running']
+            self._cond.notify_all()
+        for job in running:
+            job.stop()
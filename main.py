@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
-from scraper import ScraperEngine
+from scraper import ScraperEngine, ScrapePipeline, get_shared_pool
 from data import export_to_excel
 import os
 
@@ -59,12 +59,15 @@ class MarketingScraperGUI:
         self.max_results_var = tk.IntVar(value=10)
         self.headless_var = tk.BooleanVar(value=True)
         self.output_dir_var = tk.StringVar(value="output")
-        self.scroll_count_var = tk.IntVar(value=3)
+        self.scroll_count_var = tk.IntVar(value=2)
         
         self.scraper = None
         self.is_running = False
         
         self._create_widgets()
+        
+        # Launch the browser in the background so the first run starts warm
+        get_shared_pool(self.headless_var.get())
     
     def _create_widgets(self):
         """Create and layout all GUI widgets."""
@@ -130,9 +133,9 @@ class MarketingScraperGUI:
         self._create_spinbox_field(settings_container, "📊 Max Results", self.max_results_var, 
                                   1, 100, row=2)
         
-        # Scroll Count
-        self._create_spinbox_field(settings_container, "🔄 Scroll Count", self.scroll_count_var, 
-                                  1, 10, row=3, tooltip="Number of times to scroll the results list")
+        # Idle scrolls before the results list counts as finished
+        self._create_spinbox_field(settings_container, "🔄 Idle Scrolls", self.scroll_count_var, 
+                                  1, 10, row=3, tooltip="Scrolls in a row without new results before collecting stops")
         
         # Output Directory
         output_frame = tk.Frame(settings_container, bg='white')
@@ -402,7 +405,7 @@ class MarketingScraperGUI:
         
         if self.scraper:
             try:
-                self.scraper.close()
+                self.scraper.close(discard=True)
             except:
                 pass
     
@@ -413,40 +416,26 @@ class MarketingScraperGUI:
             location = self.location_var.get().strip()
             max_results = self.max_results_var.get()
             headless = self.headless_var.get()
-            scroll_count = self.scroll_count_var.get()
             
             # Initialize scraper
             self._update_status("Initializing browser...")
             self._log("🌐 Initializing browser...")
-            self.scraper = ScraperEngine(headless=headless)
+            self.scraper = ScraperEngine(headless=headless, pool=get_shared_pool(headless),
+                                         max_idle_scrolls=self.scroll_count_var.get())
             
             # Perform search
             self._update_status("Searching Google Maps...")
             self._log(f"🔎 Searching for '{keyword}' in '{location}'...")
             self.scraper.search(keyword, location)
             
-            # Scroll to load more results
-            self._update_status("Loading results...")
-            self._log(f"📜 Scrolling to load results (x{scroll_count})...")
-            self.scraper.scroll_results(scroll_count)
-            
-            # Get business elements
-            self._update_status("Finding businesses...")
-            business_elements = self.scraper.get_business_elements()
-            total_found = len(business_elements)
-            self._log(f"✅ Found {total_found} businesses")
-            
-            # Limit to max_results
-            business_elements = business_elements[:max_results]
-            self._log(f"📊 Processing {len(business_elements)} businesses...")
-            
-            # Extract details
+            # Collect, extract and analyze as a staged pipeline
             self._update_status("Extracting business details...")
-            businesses = self.scraper.extract_details(
-                business_elements,
-                keyword,
-                location
+            pipeline = ScrapePipeline(
+                self.scraper, keyword, location, max_results,
+                should_stop=lambda: not self.is_running,
+                on_record=lambda b: self._log(f"  ✔ {b['Business Name']}")
             )
+            businesses = pipeline.run()
             
             if not businesses:
                 self._log("❌ No data extracted")
@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
-from scraper import ScraperEngine
+from scraper import ScraperEngine, ScrapePipeline, get_shared_pool
 from data import export_to_excel
 import os
 import json
@@ -153,7 +153,7 @@ class NebulaScraperPro:
         self.max_results_var = tk.IntVar(value=20)
         self.headless_var = tk.BooleanVar(value=True)
         self.output_dir_var = tk.StringVar(value="output")
-        self.scroll_count_var = tk.IntVar(value=3)
+        self.scroll_count_var = tk.IntVar(value=2)
         
         # Advanced Marketing Filters
         self.filter_no_website_var = tk.BooleanVar(value=False)
@@ -177,6 +177,9 @@ class NebulaScraperPro:
         self.extracted_data = []
         
         self._create_widgets()
+        
+        # Launch the browser in the background so the first run starts warm
+        get_shared_pool(self.headless_var.get())
     
     def _create_widgets(self):
         """Create modern UI"""
@@ -251,7 +254,7 @@ class NebulaScraperPro:
                                  "e.g., Boston", row=1)
         self._create_modern_spinbox(search_card, "Max Results", self.max_results_var,
                                    1, 100, row=2)
-        self._create_modern_spinbox(search_card, "Scroll Count", self.scroll_count_var,
+        self._create_modern_spinbox(search_card, "Idle Scrolls", self.scroll_count_var,
                                    1, 10, row=3)
         
         # === MARKETING FILTERS ===
@@ -778,7 +781,7 @@ class NebulaScraperPro:
         
         if self.scraper:
             try:
-                self.scraper.close()
+                self.scraper.close(discard=True)
             except:
                 pass
     
@@ -789,29 +792,24 @@ class NebulaScraperPro:
             location = self.location_var.get().strip()
             max_results = self.max_results_var.get()
             headless = self.headless_var.get()
-            scroll_count = self.scroll_count_var.get()
             
             # Initialize
             self._log("Initializing browser...", 'info')
-            self.scraper = ScraperEngine(headless=headless)
+            self.scraper = ScraperEngine(headless=headless, pool=get_shared_pool(headless),
+                                         max_idle_scrolls=self.scroll_count_var.get())
             
             # Search
             self._log(f"Searching Google Maps...", 'info')
             self.scraper.search(keyword, location)
             
-            # Scroll
-            self._log(f"Loading results...", 'info')
-            self.scraper.scroll_results(scroll_count)
-            
-            # Get elements
-            business_elements = self.scraper.get_business_elements()
-            self._log(f"Found {len(business_elements)} businesses", 'success')
-            
-            # Extract
-            business_elements = business_elements[:max_results]
-            self._log(f"Extracting details from {len(business_elements)} businesses...", 'info')
-            
-            businesses = self.scraper.extract_details(business_elements, keyword, location)
+            # Collect, extract and analyze as a staged pipeline
+            self._log(f"Extracting details...", 'info')
+            pipeline = ScrapePipeline(
+                self.scraper, keyword, location, max_results,
+                should_stop=lambda: not self.is_running,
+                on_record=lambda b: self._log(f"  {b['Business Name']}", 'info')
+            )
+            businesses = pipeline.run()
             
             if not businesses:
                 self._log("No data extracted", 'error')
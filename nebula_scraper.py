@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
-from scraper import ScraperEngine
+from scraper import ScraperEngine, ScrapePipeline, get_shared_pool
 from data import export_to_excel
 import os
 from datetime import datetime
@@ -39,13 +39,16 @@ class NebulaScraper:
         self.max_results_var = tk.IntVar(value=10)
         self.headless_var = tk.BooleanVar(value=True)
         self.output_dir_var = tk.StringVar(value="output")
-        self.scroll_count_var = tk.IntVar(value=3)
+        self.scroll_count_var = tk.IntVar(value=2)
         self.stealth_mode_var = tk.BooleanVar(value=True)
         
         self.scraper = None
         self.is_running = False
         
         self._create_widgets()
+        
+        # Launch the browser in the background so the first run starts warm
+        get_shared_pool(self.headless_var.get())
     
     def _create_gradient_canvas(self, parent, width, height):
         """Create a nebula gradient background"""
@@ -129,7 +132,7 @@ class NebulaScraper:
         self._create_nebula_spinbox(settings_container, "📊 MAX RESULTS", 
                                    self.max_results_var, 1, 100, row=2)
         
-        self._create_nebula_spinbox(settings_container, "🔄 SCROLL ITERATIONS", 
+        self._create_nebula_spinbox(settings_container, "🔄 IDLE SCROLLS", 
                                    self.scroll_count_var, 1, 10, row=3)
         
         # Output Directory
@@ -471,7 +474,7 @@ class NebulaScraper:
         
         if self.scraper:
             try:
-                self.scraper.close()
+                self.scraper.close(discard=True)
             except:
                 pass
     
@@ -482,40 +485,26 @@ class NebulaScraper:
             location = self.location_var.get().strip()
             max_results = self.max_results_var.get()
             headless = self.headless_var.get()
-            scroll_count = self.scroll_count_var.get()
             
             # Initialize scraper
             self._update_status("Initializing browser...", 'running')
             self._log("🌐 Launching browser engine...", 'info')
-            self.scraper = ScraperEngine(headless=headless)
+            self.scraper = ScraperEngine(headless=headless, pool=get_shared_pool(headless),
+                                         max_idle_scrolls=self.scroll_count_var.get())
             
             # Perform search
             self._update_status("Searching Google Maps...", 'running')
             self._log(f"🔎 Searching for '{keyword}' in '{location}'...", 'info')
             self.scraper.search(keyword, location)
             
-            # Scroll to load more results
-            self._update_status("Loading results...", 'running')
-            self._log(f"📜 Scrolling to load results (x{scroll_count})...", 'info')
-            self.scraper.scroll_results(scroll_count)
-            
-            # Get business elements
-            self._update_status("Finding businesses...", 'running')
-            business_elements = self.scraper.get_business_elements()
-            total_found = len(business_elements)
-            self._log(f"✅ Found {total_found} businesses", 'success')
-            
-            # Limit to max_results
-            business_elements = business_elements[:max_results]
-            self._log(f"📊 Processing {len(business_elements)} businesses...", 'info')
-            
-            # Extract details
+            # Collect, extract and analyze as a staged pipeline
             self._update_status("Extracting business details...", 'running')
-            businesses = self.scraper.extract_details(
-                business_elements,
-                keyword,
-                location
+            pipeline = ScrapePipeline(
+                self.scraper, keyword, location, max_results,
+                should_stop=lambda: not self.is_running,
+                on_record=lambda b: self._log(f"  ✔ {b['Business Name']}", 'info')
             )
+            businesses = pipeline.run()
             
             if not businesses:
                 self._log("❌ No data extracted", 'error')
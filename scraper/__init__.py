@@ -1,3 +1,5 @@
 from .engine import ScraperEngine
+from .pool import BrowserPool, get_shared_pool
+from .pipeline import ScrapePipeline
 
-__all__ = ['ScraperEngine']
+__all__ = ['ScraperEngine', 'BrowserPool', 'ScrapePipeline', 'get_shared_pool']
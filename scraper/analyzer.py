@@ -0,0 +1,258 @@
+import asyncio
+import codecs
+import hashlib
+from functools import partial
+from .utils import get_random_user_agent
+from .httpclient import HttpClient
+from .parsers import summarize
+from .trackers import detect_trackers, FACEBOOK_PIXELS, GOOGLE_PIXELS
+from .crawler import ContactCrawler
+from .contacts import extract_contacts
+
+
+def empty_analysis():
+    """Default marketing fields for a business with no (reachable) website."""
+    return {
+        'Social_Facebook': '', 'Social_Instagram': '', 'Social_LinkedIn': '', 'Social_Twitter': '',
+        'Email_Found': '', 'Phone_Found': '', 'Ad_Pixel_FB': 'No', 'Ad_Pixel_Google': 'No', 'Trackers': '',
+        'SEO_Title': '', 'SEO_Description': '', 'SSL_Secure': 'No', 'Mobile_Friendly': 'Unknown'
+    }
+
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain', '')
+
+
+def is_html_content_type(content_type):
+    """True for HTML-ish (or undeclared) content types; False for images, video, PDFs, etc."""
+    return (content_type or '').split(';')[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+def incremental_decoder(charset=None):
+    """Incremental decoder for the declared charset, falling back to UTF-8."""
+    try:
+        return codecs.getincrementaldecoder(charset or 'utf-8')(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+async def read_capped(response, max_bytes, chunk_size=64 * 1024):
+    """
+    Stream a response body, decoding and hashing it chunk by chunk, and stop
+    once 'max_bytes' have been read. Returns (text, sha256 hexdigest, truncated).
+    """
+    decoder = incremental_decoder(response.charset)
+    digest = hashlib.sha256()
+    parts = []
+    received = 0
+    truncated = False
+
+    async for chunk in response.content.iter_chunked(chunk_size):
+        if received + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - received]
+            truncated = True
+        received += len(chunk)
+        digest.update(chunk)
+        parts.append(decoder.decode(chunk))
+        if truncated:
+            break
+
+    parts.append(decoder.decode(b'', final=True))
+    if truncated:
+        # Drop the connection rather than draining the rest of a huge body
+        response.close()
+    return ''.join(parts), digest.hexdigest(), truncated
+
+
+def apply_links(links, data, fill_only=False):
+    """Pick social profiles and a mailto: address out of a page's links into 'data'."""
+    for link in links:
+        if 'facebook.com' in link: field = 'Social_Facebook'
+        elif 'instagram.com' in link: field = 'Social_Instagram'
+        elif 'linkedin.com' in link: field = 'Social_LinkedIn'
+        elif 'twitter.com' in link or 'x.com' in link: field = 'Social_Twitter'
+        elif 'mailto:' in link:
+            field, link = 'Email_Found', link.replace('mailto:', '').split('?')[0]
+        else:
+            continue
+        if not (fill_only and data[field]):
+            data[field] = link
+
+
+def apply_contacts(html, data):
+    """Fall back to emails / phones written in the page text when links gave none."""
+    contacts = extract_contacts(html)
+    if not data['Email_Found'] and contacts.emails:
+        data['Email_Found'] = contacts.emails[0]
+    if not data['Phone_Found'] and contacts.phones:
+        data['Phone_Found'] = contacts.phones[0]
+
+
+def parse_website(html, data, backend=None):
+    """Fill the social, pixel, SEO and mobile fields of 'data' from a homepage's HTML."""
+    parse_homepage(html, data, backend)
+    return data
+
+
+def parse_homepage(html, data, backend=None):
+    """parse_website(), returning the page's links for the contact crawler."""
+    summary = summarize(html, backend)
+
+    # 1. Social Media Links, then emails / phones from the page text
+    apply_links(summary.links, data)
+    apply_contacts(html, data)
+
+    # 2. Ad Pixels / trackers (one combined signature scan)
+    trackers = detect_trackers(html)
+    data['Trackers'] = ', '.join(sorted(trackers))
+    if trackers & FACEBOOK_PIXELS:
+        data['Ad_Pixel_FB'] = 'Yes'
+    if trackers & GOOGLE_PIXELS:
+        data['Ad_Pixel_Google'] = 'Yes'
+
+    # 3. SEO Health
+    if summary.title:
+        data['SEO_Title'] = summary.title.strip()[:100]
+    if summary.description is not None:
+        data['SEO_Description'] = summary.description.strip()[:150]
+
+    # 4. Mobile Friendly (Check for viewport meta tag)
+    data['Mobile_Friendly'] = 'Yes' if summary.has_viewport else 'No'
+
+    return summary.links
+
+
+def parse_contact_page(html, data, backend=None):
+    """Fill only the still-empty social / email fields of 'data' from a secondary page."""
+    summary = summarize(html, backend)
+    apply_links(summary.links, data, fill_only=True)
+    apply_contacts(html, data)
+    return summary.links
+
+
+class WebsiteAnalyzer:
+    """
+    Analyzes business websites on a background asyncio loop so HTTP never blocks the browser.
+
+    Requests go through an HttpClient (a shared aiohttp session with a bounded
+    keep-alive pool, DNS cache and retries); 'per_host' caps concurrent
+    connections to any single host. Pass 'client' to share one with other
+    fetchers, otherwise the analyzer owns its own. Callers get a
+    concurrent.futures.Future back from submit() and can keep browsing Maps
+    while analyses complete. With an HttpCache, repeat visits
+    are served from disk or revalidated with conditional GETs.
+
+    Bodies are streamed and capped at 'max_bytes', and non-HTML responses are
+    dropped from their headers alone, so per-request memory stays bounded.
+
+    When the homepage has no email, up to 'crawl_budget' same-host pages
+    (contact / impressum / about first) are fetched to find one; 0 disables it.
+    """
+
+    def __init__(self, max_connections=50, per_host=2, timeout=10, http_cache=None, parser_backend=None,
+                 max_bytes=2 * 1024 * 1024, crawl_budget=3, client=None):
+        self.http_cache = http_cache
+        self.parser_backend = parser_backend
+        self.max_bytes = max_bytes
+        self.crawl_budget = crawl_budget
+        self._owns_client = client is None
+        self.client = client or HttpClient(max_connections=max_connections, per_host=per_host, timeout=timeout)
+
+    def submit(self, url, should_stop=None):
+        """Schedule analysis of 'url' and return a Future resolving to the analysis dict."""
+        return self.client.submit(self._analyze(url, should_stop))
+
+    def analyze(self, url, should_stop=None):
+        """Blocking analysis of a single website."""
+        return self.submit(url, should_stop).result()
+
+    async def _analyze(self, url, should_stop=None):
+        data = empty_analysis()
+
+        if not url:
+            return data
+
+        if should_stop and should_stop():
+            return data
+
+        try:
+            # Check SSL
+            if url.startswith('https'):
+                data['SSL_Secure'] = 'Yes'
+
+            cached = self.http_cache.get(url) if self.http_cache else None
+            if cached and self.http_cache.is_fresh(cached):
+                self.http_cache.count('fresh')
+                return cached['analysis']
+
+            headers = {'User-Agent': get_random_user_agent()}
+            if cached:
+                headers.update(self.http_cache.conditional_headers(cached))
+
+            async with self.client.get(url, headers=headers) as response:
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if cached and response.status == 304:
+                    self.http_cache.touch(url, etag, last_modified)
+                    self.http_cache.count('not_modified')
+                    return cached['analysis']
+                status = response.status
+                if not is_html_content_type(response.headers.get('Content-Type')):
+                    print(f"  [Website Analysis Skipped] {url}: {response.headers.get('Content-Type')}")
+                    response.close()
+                    return data
+                html, digest, truncated = await read_capped(response, self.max_bytes)
+                if truncated:
+                    print(f"  [Website Truncated] {url}: analyzed first {self.max_bytes // 1024} KB")
+
+            if should_stop and should_stop():
+                return data
+
+            if cached and cached['body_hash'] == digest:
+                # Server ignored the validators but the page is byte-for-byte the same
+                self.http_cache.touch(url, etag, last_modified)
+                self.http_cache.count('unchanged')
+                return cached['analysis']
+
+            # Parsing is CPU-bound; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            links = await loop.run_in_executor(None, parse_homepage, html, data, self.parser_backend)
+
+            if self.crawl_budget and status < 400:
+                crawler = ContactCrawler(
+                    partial(self._fetch_page, headers={'User-Agent': headers['User-Agent']}),
+                    self._parse_contact_page,
+                    page_budget=self.crawl_budget,
+                    concurrency=self.client.per_host
+                )
+                if not crawler.satisfied(data):
+                    await crawler.crawl(str(response.url), links, data, should_stop)
+
+            if self.http_cache and status < 400:
+                self.http_cache.put(url, data, etag, last_modified, digest)
+                self.http_cache.count('changed' if cached else 'new')
+
+        except Exception as e:
+            print(f"  [Website Analysis Failed] {url}: {e!r}")
+
+        return data
+
+    async def _fetch_page(self, url, headers=None):
+        """Capped GET of a secondary page; None unless it is a successful HTML response."""
+        try:
+            async with self.client.get(url, headers=headers) as response:
+                if response.status >= 400 or not is_html_content_type(response.headers.get('Content-Type')):
+                    response.close()
+                    return None
+                html, _, _ = await read_capped(response, self.max_bytes)
+                return html
+        except Exception as e:
+            print(f"  [Contact Crawl Failed] {url}: {e!r}")
+            return None
+
+    async def _parse_contact_page(self, html, data):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, parse_contact_page, html, data, self.parser_backend)
+
+    def close(self):
+        if self._owns_client:
+            self.client.close()
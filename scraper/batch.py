@@ -0,0 +1,264 @@
+"""
+Batch runner for keyword x location grids.
+
+The grid is sharded across worker processes, each with its own ScraperEngine
+(and Chrome driver). Every shard appends its records to a JSONL part file as
+each query finishes. Once all shards are done the parts are merged,
+deduplicated and written to one output file.
+
+Grid formats:
+    CSV   with 'keyword' and 'location' columns. If every row has both, each
+          row is one query; otherwise the two columns are crossed.
+    JSON  {"keywords": [...], "locations": [...]} (crossed), or a list of
+          {"keyword": ..., "location": ...} objects.
+
+Usage:
+    python -m scraper.batch grid.csv [--workers 3] [--max-results 20] [--out results/batch.xlsx]
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+
+def load_grid(path):
+    """Read a grid file into a list of (keyword, location) queries, duplicates removed, order kept."""
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            pairs = itertools.product(data.get('keywords', []), data.get('locations', []))
+        else:
+            pairs = ((item.get('keyword', ''), item.get('location', '')) for item in data)
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            rows = [{k.strip().lower(): (v or '').strip() for k, v in row.items() if k} for row in csv.DictReader(f)]
+        if all(row.get('keyword') and row.get('location') for row in rows):
+            pairs = ((row['keyword'], row['location']) for row in rows)
+        else:
+            keywords = [row['keyword'] for row in rows if row.get('keyword')]
+            locations = [row['location'] for row in rows if row.get('location')]
+            pairs = itertools.product(keywords, locations)
+
+    queries = []
+    for keyword, location in pairs:
+        query = (keyword.strip(), location.strip())
+        if all(query) and query not in queries:
+            queries.append(query)
+    return queries
+
+
+def shard(queries, workers):
+    """Round-robin the queries into at most 'workers' shards."""
+    shards = [queries[i::workers] for i in range(workers)]
+    return [s for s in shards if s]
+
+
+def record_key(record):
+    """Identity of a business across queries: the same name at the same address."""
+    return (record.get('Business Name', '').strip().lower(), record.get('Address', '').strip().lower())
+
+
+def run_shard(index, queries, options, progress):
+    """Worker process: run each query of one shard and append its records to the shard's part file."""
+    from .engine import ScraperEngine
+    from .pipeline import ScrapePipeline
+    from .cache import PlaceCache
+
+    place_cache = PlaceCache(options['place_cache']) if options.get('place_cache') else None
+    part_path = os.path.join(options['work_dir'], f"shard_{index}.jsonl")
+    engine = None
+    try:
+        engine = ScraperEngine(headless=True, place_cache=place_cache, **options.get('engine', {}))
+        for number, (keyword, location) in enumerate(queries, 1):
+            started = time.time()
+            records = []
+            try:
+                if engine.search(keyword, location):
+                    records = ScrapePipeline(engine, keyword, location, options['max_results'],
+                                             analyzer_workers=options.get('analyzer_workers', 8)).run()
+            except Exception as e:
+                progress.put({'shard': index, 'event': 'error', 'query': f"{keyword} in {location}", 'error': repr(e)})
+            with open(part_path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            progress.put({'shard': index, 'event': 'query_done', 'query': f"{keyword} in {location}",
+                          'done': number, 'total': len(queries), 'listings': len(records),
+                          'seconds': time.time() - started})
+    except Exception as e:
+        progress.put({'shard': index, 'event': 'error', 'query': None, 'error': repr(e)})
+    finally:
+        if engine:
+            engine.close()
+        if place_cache:
+            place_cache.close()
+        progress.put({'shard': index, 'event': 'shard_done'})
+
+
+def merge_parts(work_dir, shard_count):
+    """Records from every shard part file, first occurrence of each business kept."""
+    merged = {}
+    for index in range(shard_count):
+        path = os.path.join(work_dir, f"shard_{index}.jsonl")
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    merged.setdefault(record_key(record), record)
+    return list(merged.values())
+
+
+def write_output(records, path):
+    """Write merged records as .xlsx (via DataExporter), .csv or .json / .jsonl."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    lower = path.lower()
+    if lower.endswith('.xlsx'):
+        from data.exporter import DataExporter
+        return DataExporter().export_to_excel(records, path)
+    if lower.endswith('.csv'):
+        columns = list(dict.fromkeys(key for record in records for key in record))
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(records)
+        return True
+    with open(path, 'w', encoding='utf-8') as f:
+        if lower.endswith('.jsonl'):
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+    return True
+
+
+class BatchRunner:
+    """
+    Shards a query grid over 'workers' processes and reports progress as
+    shards finish queries. run() returns the merged, deduplicated records.
+    """
+
+    def __init__(self, queries, workers=2, max_results=20, work_dir=os.path.join('cache', 'batch'),
+                 place_cache=None, analyzer_workers=8, engine_options=None, on_progress=None):
+        self.queries = queries
+        self.workers = max(1, workers)
+        self.options = {
+            'max_results': max_results,
+            'work_dir': work_dir,
+            'place_cache': place_cache,
+            'analyzer_workers': analyzer_workers,
+            'engine': engine_options or {},
+        }
+        self.on_progress = on_progress or self.print_progress
+        self.shards = {}
+        self.started_at = None
+        self.listings = 0
+
+    def run(self):
+        shards = shard(self.queries, self.workers)
+        os.makedirs(self.options['work_dir'], exist_ok=True)
+        for index in range(len(shards)):
+            part = os.path.join(self.options['work_dir'], f"shard_{index}.jsonl")
+            if os.path.exists(part):
+                os.remove(part)
+
+        # Spawn rather than fork: each worker starts its own Chrome from a clean interpreter
+        context = multiprocessing.get_context('spawn')
+        progress = context.Queue()
+        processes = [
+            context.Process(target=run_shard, args=(index, queries, self.options, progress), daemon=True)
+            for index, queries in enumerate(shards)
+        ]
+        self.shards = {index: {'done': 0, 'total': len(queries), 'listings': 0, 'finished': False}
+                       for index, queries in enumerate(shards)}
+        self.started_at = time.time()
+        for process in processes:
+            process.start()
+
+        try:
+            while not all(state['finished'] for state in self.shards.values()):
+                try:
+                    message = progress.get(timeout=5)
+                except queue.Empty:
+                    # A worker that died without reporting (e.g. killed Chrome) still counts as finished
+                    for index, process in enumerate(processes):
+                        if not process.is_alive():
+                            self.shards[index]['finished'] = True
+                    continue
+                self._update(message)
+                self.on_progress(message, self)
+        finally:
+            for process in processes:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+
+        return merge_parts(self.options['work_dir'], len(shards))
+
+    def _update(self, message):
+        state = self.shards[message['shard']]
+        if message['event'] == 'query_done':
+            state['done'] = message['done']
+            state['listings'] += message['listings']
+            self.listings += message['listings']
+        elif message['event'] == 'shard_done':
+            state['finished'] = True
+
+    def listings_per_minute(self):
+        elapsed = time.time() - self.started_at if self.started_at else 0
+        return self.listings / (elapsed / 60) if elapsed else 0.0
+
+    @staticmethod
+    def print_progress(message, runner):
+        shard_id = f"[shard {message['shard']}]"
+        if message['event'] == 'query_done':
+            print(f"{shard_id} {message['done']}/{message['total']} {message['query']}: "
+                  f"{message['listings']} listings in {message['seconds']:.0f}s "
+                  f"(total {runner.listings}, {runner.listings_per_minute():.1f}/min)")
+        elif message['event'] == 'error':
+            print(f"{shard_id} error{' on ' + message['query'] if message['query'] else ''}: {message['error']}")
+        elif message['event'] == 'shard_done':
+            print(f"{shard_id} finished")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m scraper.batch',
+                                     description='Scrape every keyword x location in a grid file.')
+    parser.add_argument('grid', help='CSV or JSON grid of keywords and locations')
+    parser.add_argument('--workers', type=int, default=2, help='parallel worker processes (one browser each)')
+    parser.add_argument('--max-results', type=int, default=20, help='listings per query')
+    parser.add_argument('--out', default=os.path.join('results', f"batch_{time.strftime('%Y%m%d_%H%M%S')}.xlsx"),
+                        help='merged output (.xlsx, .csv, .json or .jsonl)')
+    parser.add_argument('--work-dir', default=os.path.join('cache', 'batch'), help='per-shard part files')
+    parser.add_argument('--place-cache', default=os.path.join('cache', 'places.db'),
+                        help="place details cache shared by the workers ('' to disable)")
+    parser.add_argument('--extraction', default='dom', choices=['dom', 'click', 'network'])
+    args = parser.parse_args(argv)
+
+    queries = load_grid(args.grid)
+    if not queries:
+        print("Grid is empty")
+        return 1
+    workers = min(args.workers, len(queries))
+    print(f"{len(queries)} queries across {workers} workers")
+
+    runner = BatchRunner(queries, workers=workers, max_results=args.max_results, work_dir=args.work_dir,
+                         place_cache=args.place_cache or None, engine_options={'extraction': args.extraction})
+    records = runner.run()
+    elapsed = time.time() - runner.started_at
+    write_output(records, args.out)
+    print(f"\n{runner.listings} listings ({len(records)} unique) in {elapsed / 60:.1f} min "
+          f"= {runner.listings_per_minute():.1f} listings/min")
+    print(f"Saved {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+"""
+On-disk cache of extracted place details, keyed by a normalized Maps place identifier.
+
+Usage:
+    python -m scraper.cache stats
+    python -m scraper.cache list [--limit N]
+    python -m scraper.cache show <place url or id>
+    python -m scraper.cache purge [--expired]
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, parse_qs, unquote
+
+
+DEFAULT_DB = os.path.join('cache', 'places.db')
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Fields that describe the search that found a place rather than the place itself
+_QUERY_FIELDS = ('Keyword', 'City')
+
+
+def place_id_from_url(url):
+    """
+    Normalize a Maps place href (a.hfpxzc) to a stable identifier.
+
+    Prefers the ChIJ place ID (!19s...), then the 0x...:0x... feature ID
+    (!1s...), then a cid= query parameter, and finally the bare place path.
+    """
+    if not url:
+        return ''
+    decoded = unquote(url)
+
+    match = re.search(r'!19s(ChIJ[\w-]+)', decoded)
+    if match:
+        return match.group(1)
+
+    match = re.search(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', decoded, re.IGNORECASE)
+    if match:
+        return match.group(1).lower()
+
+    parsed = urlparse(decoded)
+    cid = parse_qs(parsed.query).get('cid')
+    if cid:
+        return f"cid:{cid[0]}"
+
+    path = re.sub(r'/(data=|@).*$', '', parsed.path).rstrip('/')
+    return f"{parsed.netloc}{path}".lower()
+
+
+class PlaceCache:
+    """SQLite-backed cache of business_data dicts with a TTL and hit/miss counters."""
+
+    def __init__(self, path=DEFAULT_DB, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS places (
+                place_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def get(self, url):
+        """Return the cached record for a place URL if it is still fresh, else None."""
+        place_id = place_id_from_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data, fetched_at FROM places WHERE place_id = ?', (place_id,)
+            ).fetchone()
+            if row is None or (self.ttl and time.time() - row['fetched_at'] > self.ttl):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row['data'])
+
+    def put(self, url, business_data):
+        data = {k: v for k, v in business_data.items() if k not in _QUERY_FIELDS}
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO places (place_id, url, data, fetched_at) VALUES (?, ?, ?, ?)',
+                (place_id_from_url(url), url, json.dumps(data), time.time())
+            )
+            self._conn.commit()
+
+    def purge(self, expired_only=False):
+        """Delete cached places (only the stale ones if 'expired_only'). Returns the number removed."""
+        with self._lock:
+            if expired_only:
+                cur = self._conn.execute('DELETE FROM places WHERE fetched_at < ?', (time.time() - self.ttl,))
+            else:
+                cur = self._conn.execute('DELETE FROM places')
+            self._conn.commit()
+        return cur.rowcount
+
+    def entries(self, limit=50):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT place_id, url, data, fetched_at FROM places ORDER BY fetched_at DESC LIMIT ?', (limit,)
+            ).fetchall()
+
+    def lookup(self, key):
+        """Find one entry by place URL or already-normalized place ID, ignoring the TTL."""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT place_id, url, data, fetched_at FROM places WHERE place_id IN (?, ?)',
+                (key, place_id_from_url(key))
+            ).fetchone()
+
+    def stats(self):
+        with self._lock:
+            total = self._conn.execute('SELECT COUNT(*) FROM places').fetchone()[0]
+            fresh = self._conn.execute(
+                'SELECT COUNT(*) FROM places WHERE fetched_at >= ?', (time.time() - self.ttl,)
+            ).fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': total,
+            'fresh': fresh,
+            'expired': total - fresh,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m scraper.cache', description='Inspect or purge the place details cache.')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'cache database (default: {DEFAULT_DB})')
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL / 3600, help='freshness window in hours')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='show entry counts')
+    list_cmd = sub.add_parser('list', help='list the most recently cached places')
+    list_cmd.add_argument('--limit', type=int, default=20)
+    show_cmd = sub.add_parser('show', help='print one cached record')
+    show_cmd.add_argument('key', help='place URL or place ID')
+    purge_cmd = sub.add_parser('purge', help='delete cached places')
+    purge_cmd.add_argument('--expired', action='store_true', help='only delete entries older than the TTL')
+    args = parser.parse_args(argv)
+
+    cache = PlaceCache(args.db, ttl=args.ttl * 3600)
+    try:
+        if args.command == 'stats':
+            stats = cache.stats()
+            print(f"Entries: {stats['entries']} ({stats['fresh']} fresh, {stats['expired']} expired)")
+        elif args.command == 'list':
+            for row in cache.entries(args.limit):
+                name = json.loads(row['data']).get('Business Name', '')
+                age_h = (time.time() - row['fetched_at']) / 3600
+                print(f"{row['place_id']:<45} {age_h:7.1f}h  {name}")
+        elif args.command == 'show':
+            row = cache.lookup(args.key)
+            if row is None:
+                print("Not cached")
+                return 1
+            print(json.dumps(json.loads(row['data']), indent=2, ensure_ascii=False))
+        elif args.command == 'purge':
+            removed = cache.purge(expired_only=args.expired)
+            print(f"Removed {removed} cached places")
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
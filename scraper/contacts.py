@@ -0,0 +1,129 @@
+import html as htmllib
+import re
+
+
+# Everything that never renders as text, removed before tags are stripped
+_INVISIBLE = re.compile(r'<(script|style|noscript|template|svg)\b.*?</\1\s*>|<!--.*?-->', re.S | re.I)
+_TAG = re.compile(r'<[^>]*>')
+_WHITESPACE = re.compile(r'\s+')
+
+EMAIL_RE = re.compile(r'[a-z0-9][a-z0-9._%+\-]*@[a-z0-9][a-z0-9.\-]*\.[a-z]{2,24}\b', re.I)
+
+# "info [at] acme (dot) com", "info{at}acme{dot}com", "info [@] acme [.] com"
+_OBFUSCATED_AT = re.compile(r'\s*[\[({<]\s*(?:at|@)\s*[\])}>]\s*', re.I)
+_OBFUSCATED_DOT = re.compile(r'\s*[\[({<]\s*(?:dot|\.)\s*[\])}>]\s*', re.I)
+
+# Cloudflare email protection: <a data-cfemail="hex"> or href="/cdn-cgi/l/email-protection#hex"
+_CF_EMAIL = re.compile(r'(?:data-cfemail="|/cdn-cgi/l/email-protection#)([0-9a-f]{4,})', re.I)
+
+_TEL_HREF = re.compile(r'href=["\']tel:([^"\']+)', re.I)
+PHONE_RE = re.compile(r'(?<![\w/.])(?:\+|\(\+?)?\d[\d\s().\-/]{5,20}\d(?![\w/])')
+_YEAR_RANGE = re.compile(r'^(?:19|20)\d\d\s*[-/]\s*(?:19|20)?\d\d$')
+_DATE = re.compile(r'^\d{1,4}[./-]\d{1,2}[./-]\d{1,4}$')
+
+# A bare digit run in page text is only taken as a phone number with one of these:
+# a label just before it ("Tel:", "Call us", ...), a leading +, or a phone-style grouping
+_PHONE_LABEL = re.compile(r'(?:\b(?:tel|phone|call|mobile|mob|cell|ph|whatsapp)|☎|📞)\w*\W{0,4}(?:\w+\W{1,3}){0,2}$', re.I)
+_PHONE_GROUPING = re.compile(
+    r'^(?:\+?1[\s.\-])?\(?\d{3}\)?[.\-]\d{3}[.\-]\d{4}$'   # 555-010-2000, 555.010.2000
+    r'|^\(\d{2,5}\)\s?\d{3,4}[\s.\-]?\d{3,4}$'             # (555) 010-2000, (020) 7946 0958
+)
+
+_NOT_EMAIL_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.css', '.js')
+
+
+class ContactInfo:
+    """Deduplicated emails and phone numbers found on a page, in page order."""
+
+    def __init__(self):
+        self.emails = []
+        self.phones = []
+
+    def add_email(self, email):
+        email = email.strip('.').lower()
+        if is_valid_email(email) and email not in self.emails:
+            self.emails.append(email)
+
+    def add_phone(self, phone):
+        phone = _WHITESPACE.sub(' ', phone).strip()
+        key = phone_key(phone)
+        if is_valid_phone(phone) and key not in (phone_key(p) for p in self.phones):
+            self.phones.append(phone)
+
+
+def decode_cfemail(encoded):
+    """Decode a Cloudflare-protected address: the first byte is an XOR key for the rest."""
+    try:
+        key = int(encoded[:2], 16)
+        return ''.join(chr(int(encoded[i:i + 2], 16) ^ key) for i in range(2, len(encoded) - 1, 2))
+    except ValueError:
+        return ''
+
+
+def visible_text(html):
+    """Page text with scripts, styles, comments and tags removed and entities decoded."""
+    return htmllib.unescape(_TAG.sub(' ', _INVISIBLE.sub(' ', html)))
+
+
+def deobfuscate(text):
+    """Turn '[at]' / '(dot)' style spellings back into '@' and '.'."""
+    if '[' not in text and '(' not in text and '{' not in text and '<' not in text:
+        return text
+    return _OBFUSCATED_DOT.sub('.', _OBFUSCATED_AT.sub('@', text))
+
+
+def is_valid_email(email):
+    local, _, domain = email.partition('@')
+    return (
+        bool(local) and '..' not in email and not local.endswith('.')
+        and not domain.startswith('-') and not email.endswith(_NOT_EMAIL_SUFFIXES)
+    )
+
+
+def phone_key(phone):
+    """Digits only, so '+1 (555) 010-2000' and '+1 555 010 2000' dedupe."""
+    return ''.join(ch for ch in phone if ch.isdigit())
+
+
+def is_valid_phone(phone):
+    digits = phone_key(phone)
+    if not 7 <= len(digits) <= 15 or len(set(digits)) < 3:
+        return False
+    return not (_YEAR_RANGE.match(phone) or _DATE.match(phone))
+
+
+def looks_like_phone(text, match):
+    """Whether a PHONE_RE match in 'text' has phone context rather than being any digit run (prices, order numbers)."""
+    phone = match.group().strip()
+    if phone.startswith(('+', '(+')) or _PHONE_GROUPING.match(phone):
+        return True
+    return bool(_PHONE_LABEL.search(text[max(0, match.start() - 30):match.start()]))
+
+
+def extract_contacts(html):
+    """
+    Emails and phone numbers from a page in one pass over its visible text.
+
+    tel: links and Cloudflare-protected addresses are read from the raw HTML
+    first (they are the most reliable); the visible text is then
+    deobfuscated and scanned once per pattern. Numbers in the text count only
+    with phone context (see looks_like_phone).
+    """
+    info = ContactInfo()
+
+    if 'cfemail' in html or 'email-protection' in html:
+        for encoded in _CF_EMAIL.findall(html):
+            info.add_email(decode_cfemail(encoded))
+    if 'tel:' in html:
+        for number in _TEL_HREF.findall(html):
+            info.add_phone(htmllib.unescape(number))
+
+    text = deobfuscate(visible_text(html))
+    if '@' in text:
+        for email in EMAIL_RE.findall(text):
+            info.add_email(email)
+    for match in PHONE_RE.finditer(text):
+        if looks_like_phone(text, match):
+            info.add_phone(match.group())
+
+    return info
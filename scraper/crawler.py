@@ -0,0 +1,105 @@
+import asyncio
+import heapq
+import re
+from urllib.parse import urljoin, urlparse, urldefrag
+
+
+# Path keywords that usually lead to contact details, best first (lower rank = crawled sooner)
+CONTACT_KEYWORDS = [
+    (0, ('contact', 'kontakt', 'contacto', 'contatti', 'impressum', 'imprint')),
+    (1, ('about', 'ueber-uns', 'uber-uns', 'about-us', 'chi-siamo', 'quienes-somos', 'team')),
+    (2, ('legal', 'location', 'store', 'office', 'support', 'help')),
+]
+OTHER_RANK = 9
+
+SKIPPED_EXTENSIONS = re.compile(r'\.(?:pdf|jpe?g|png|gif|webp|svg|zip|mp4|mp3|docx?|xlsx?|css|js)$', re.I)
+
+
+def _bare_host(netloc):
+    host = netloc.lower().split(':')[0]
+    return host[4:] if host.startswith('www.') else host
+
+
+def link_rank(url):
+    """Crawl priority of a link: 0 for contact/impressum pages, then about/team, then the rest."""
+    path = urlparse(url).path.lower()
+    for rank, keywords in CONTACT_KEYWORDS:
+        if any(keyword in path for keyword in keywords):
+            return rank
+    return OTHER_RANK
+
+
+def same_host_links(base_url, links):
+    """Absolute, de-fragmented http(s) links from 'links' on the same host as 'base_url' (www. ignored)."""
+    host = _bare_host(urlparse(base_url).netloc)
+    seen = set()
+    for link in links:
+        if not link or link.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+            continue
+        url = urldefrag(urljoin(base_url, link.strip()))[0]
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or _bare_host(parsed.netloc) != host:
+            continue
+        if SKIPPED_EXTENSIONS.search(parsed.path) or url in seen:
+            continue
+        seen.add(url)
+        yield url
+
+
+class ContactCrawler:
+    """
+    Bounded crawl of one website for contact details the homepage didn't have.
+
+    Same-host links are kept in a priority queue ranked by link_rank(), so
+    /contact and /impressum are fetched before /about and anything else. Up to
+    'concurrency' pages are fetched at once, and the crawl ends as soon as all
+    of 'wanted' are filled in or 'page_budget' pages have been fetched.
+
+    'fetch' is a coroutine function url -> html (or None), and 'parse' a
+    coroutine function (html, data) -> links that fills missing fields of 'data'.
+    """
+
+    def __init__(self, fetch, parse, page_budget=3, wanted=('Email_Found',), concurrency=2):
+        self.fetch = fetch
+        self.parse = parse
+        self.page_budget = page_budget
+        self.wanted = wanted
+        self.concurrency = max(1, concurrency)
+
+    def satisfied(self, data):
+        return all(data.get(field) for field in self.wanted)
+
+    async def crawl(self, home_url, links, data, should_stop=None):
+        """Fill 'data' from pages linked off the homepage; returns the URLs fetched."""
+        queued = {home_url, home_url.rstrip('/')}
+        heap = []
+        counter = 0
+
+        def enqueue(base_url, found_links):
+            nonlocal counter
+            for url in same_host_links(base_url, found_links):
+                if url in queued or url.rstrip('/') in queued:
+                    continue
+                queued.add(url)
+                heapq.heappush(heap, (link_rank(url), counter, url))
+                counter += 1
+
+        enqueue(home_url, links)
+        fetched = []
+
+        while heap and len(fetched) < self.page_budget and not self.satisfied(data):
+            if should_stop and should_stop():
+                break
+            batch = []
+            while heap and len(batch) < min(self.concurrency, self.page_budget - len(fetched)):
+                batch.append(heapq.heappop(heap)[2])
+            fetched.extend(batch)
+
+            pages = await asyncio.gather(*(self.fetch(url) for url in batch), return_exceptions=True)
+            # Apply in priority order so a contact page's email wins over an about page's
+            for url, html in zip(batch, pages):
+                if not html or isinstance(html, BaseException):
+                    continue
+                enqueue(url, await self.parse(html, data))
+
+        return fetched
@@ -1,376 +1,410 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import time
-import random
-import requests
-import re
+from selenium.common.exceptions import NoSuchElementException
+import threading
 from urllib.parse import urlparse
-from .utils import get_random_user_agent
+from .pool import create_driver, PooledDriver, apply_resource_blocking
+from .ratelimit import DomainRateLimiter
+from .analyzer import WebsiteAnalyzer, empty_analysis
+from .extractors import extract_detail_panel, read_feed_cards, open_detail_panel
+from .feed import wait_for_more_cards
+from .network import NetworkCapture, parse_payload, listing_key
+from .readiness import wait_until_ready, mark_stale
+from .pipeline import ScrapePipeline
 
 
 class ScraperEngine:
     """Main scraper engine for extracting business data from Google Maps."""
     
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, pool=None, detail_workers=1, maps_rate_limit=2.0, analyzer=None,
+                 scroll_idle_timeout=10, max_idle_scrolls=2, place_cache=None, extraction='dom',
+                 block_resources=None, page_load_strategy='normal', rate_limiter=None, acquire_timeout=None):
         self.driver = None
         self.headless = headless
         self.results = []
+        self.pool = pool
+        self.detail_workers = max(1, detail_workers)
+        # Engines running side by side must share one limiter to keep the per-domain ceiling
+        self.rate_limiter = rate_limiter or DomainRateLimiter(rate=maps_rate_limit)
+        self.scroll_idle_timeout = scroll_idle_timeout
+        self.max_idle_scrolls = max_idle_scrolls
+        self.place_cache = place_cache
+        self.extraction = extraction
+        self.block_resources = pool.block_resources if pool else block_resources
+        self.page_load_strategy = pool.page_load_strategy if pool else page_load_strategy
+        # Seconds to wait for a pooled browser (None: the pool's own default)
+        self.acquire_timeout = acquire_timeout
+        self._lease = None
+        self._close_lock = threading.Lock()
+        self._owns_analyzer = analyzer is None
+        self.analyzer = analyzer or WebsiteAnalyzer()
         self._setup_driver()
     
     def _setup_driver(self):
-        """Setup Chrome WebDriver with options and user agent rotation."""
-        chrome_options = Options()
-        if self.headless:
-            chrome_options.add_argument('--headless=new')
-        
-        user_agent = get_random_user_agent()
-        chrome_options.add_argument(f'user-agent={user_agent}')
-        
-        # Anti-detection
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--window-size=1920,1080')
-        
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        """Setup Chrome WebDriver, checking out a warm one when a BrowserPool is given."""
+        if self.pool:
+            self._lease = self.pool.acquire(timeout=self.acquire_timeout)
+        else:
+            self._lease = self._launch_driver()
+        self.driver = self._lease.driver
+
+    def _launch_driver(self):
+        return PooledDriver(create_driver(headless=self.headless, network_capture=self.extraction == 'network',
+                                          block_resources=self.block_resources,
+                                          page_load_strategy=self.page_load_strategy))
+    
+    def _open(self, url, lease=None):
+        """Navigate a driver, counting the page load against its recycle budget."""
+        lease = lease or self._lease
+        if self.page_load_strategy == 'none':
+            mark_stale(lease.driver)
+        lease.driver.get(url)
+        lease.pages += 1
+    
+    def checkout_workers(self, count):
+        """Get up to 'count' extra drivers for PHASE 2 workers, from the pool when there is one."""
+        leases = []
+        for _ in range(count):
+            try:
+                if self.pool:
+                    leases.append(self.pool.acquire(timeout=10))
+                else:
+                    leases.append(self._launch_driver())
+            except Exception as e:
+                print(f"Could not start extra detail worker: {e}")
+                break
+        return leases
     
-    def search(self, keyword, location):
+    def return_workers(self, leases):
+        """Give drivers from checkout_workers() back to the pool (or quit them)."""
+        for lease in leases:
+            if self.pool:
+                self.pool.release(lease)
+            else:
+                lease.quit()
+    
+    def search(self, keyword, location, at=None):
+        """
+        Open the results feed for 'keyword in location', or, with at=(lat, lng, zoom),
+        for 'keyword' within that map viewport (used by tiled searches).
+        """
         try:
-            query = f"{keyword} in {location}"
-            url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
+            if at:
+                lat, lng, zoom = at
+                query = f"{keyword} near {lat:.5f},{lng:.5f} z{zoom}"
+                url = f"https://www.google.com/maps/search/{keyword.replace(' ', '+')}/@{lat:.7f},{lng:.7f},{zoom}z"
+            else:
+                query = f"{keyword} in {location}"
+                url = f"https://www.google.com/maps/search/{query.replace(' ', '+')}"
             print(f"Searching for: {query}")
-            self.driver.get(url)
-            time.sleep(3)
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[role='feed']"))
-            )
+            self._open(url)
+            if not wait_until_ready(self.driver, 'feed', timeout=15):
+                print("Error during search: results feed did not load")
+                return False
             return True
         except Exception as e:
             print(f"Error during search: {str(e)}")
             return False
     
+    def wait_for_more_results(self, previous_count):
+        """Scroll the feed and wait (event-driven) for cards beyond 'previous_count'."""
+        return wait_for_more_cards(self.driver, previous_count, self.scroll_idle_timeout)
+    
     def scroll_and_collect(self, max_results=20, should_stop=None):
         try:
             results_container = self.driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
-            business_elements = []
-            last_count = 0
-            scroll_attempts = 0
+            count = 0
+            idle_rounds = 0
             
             print("Scrolling to load results...")
-            while len(business_elements) < max_results and scroll_attempts < 50:
+            while count < max_results and idle_rounds < self.max_idle_scrolls:
                 if should_stop and should_stop():
                     print("Scraping aborted during scrolling.")
                     return []
 
-                business_elements = results_container.find_elements(By.CSS_SELECTOR, "div[role='article']")
-                current_count = len(business_elements)
-                
-                if current_count == last_count:
-                    scroll_attempts += 1
-                else:
-                    scroll_attempts = 0
-                    last_count = current_count
+                state = self.wait_for_more_results(count)
+                idle_rounds = idle_rounds + 1 if state['timeout'] else 0
+                count = state['count']
                 
-                if business_elements:
-                    self.driver.execute_script("arguments[0].scrollIntoView();", business_elements[-1])
-                    time.sleep(random.uniform(1, 2))
+                if state['end']:
+                    print(f"Reached the end of the list at {count} results")
+                    break
             
+            business_elements = results_container.find_elements(By.CSS_SELECTOR, "div[role='article']")
             return business_elements[:max_results]
         except Exception as e:
             print(f"Error during scrolling: {str(e)}")
             return []
 
-    def analyze_website(self, url, should_stop=None):
+    def stream_cards(self, max_results=20, should_stop=None):
         """
-        Deep scan of the business website to extract advanced marketing data.
-        Returns a dictionary of findings.
+        Scroll the feed and yield result cards (see harvest_cards) as each scroll
+        round loads them, up to 'max_results', so place pages can be worked on
+        while the feed is still scrolling.
         """
-        data = {
-            'Social_Facebook': '', 'Social_Instagram': '', 'Social_LinkedIn': '', 'Social_Twitter': '',
-            'Email_Found': '', 'Ad_Pixel_FB': 'No', 'Ad_Pixel_Google': 'No',
-            'SEO_Title': '', 'SEO_Description': '', 'SSL_Secure': 'No', 'Mobile_Friendly': 'Unknown'
-        }
-        
-        if not url:
-            return data
+        seen = set()
+        count, idle_rounds, end = 0, 0, False
+        print("Scrolling to load results...")
+        while True:
+            if should_stop and should_stop():
+                print("Scraping aborted during scrolling.")
+                return
 
-        if should_stop and should_stop():
-            return data
+            for card in self.harvest_cards():
+                if len(seen) >= max_results:
+                    break
+                if card['url'] and card['url'] not in seen:
+                    seen.add(card['url'])
+                    yield card
 
-        try:
-            # Check SSL
-            if url.startswith('https'):
-                data['SSL_Secure'] = 'Yes'
-            
-            # Request the page
-            headers = {'User-Agent': get_random_user_agent()}
-            
-            if should_stop and should_stop():
-                return data
+            if end or len(seen) >= max_results or idle_rounds >= self.max_idle_scrolls:
+                return
 
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if should_stop and should_stop():
-                return data
+            state = self.wait_for_more_results(count)
+            idle_rounds = idle_rounds + 1 if state['timeout'] else 0
+            count = state['count']
+            if state['end']:
+                print(f"Reached the end of the list at {count} results")
+                end = True
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            text_content = response.text.lower()
-            
-            # 1. Social Media Links
-            links = [a.get('href') for a in soup.find_all('a', href=True)]
-            for link in links:
-                if 'facebook.com' in link: data['Social_Facebook'] = link
-                elif 'instagram.com' in link: data['Social_Instagram'] = link
-                elif 'linkedin.com' in link: data['Social_LinkedIn'] = link
-                elif 'twitter.com' in link or 'x.com' in link: data['Social_Twitter'] = link
-                elif 'mailto:' in link: 
-                    data['Email_Found'] = link.replace('mailto:', '').split('?')[0]
+    def analyze_website(self, url, should_stop=None):
+        """
+        Deep scan of the business website to extract advanced marketing data.
+        Returns a dictionary of findings. Blocks; use self.analyzer.submit() to overlap with browsing.
+        """
+        return self.analyzer.analyze(url, should_stop=should_stop)
 
-            # 2. Ad Pixels (Regex search in scripts)
-            if 'fbevents.js' in text_content or 'fbq(' in text_content:
-                data['Ad_Pixel_FB'] = 'Yes'
-            if 'gtag(' in text_content or 'google-analytics.com' in text_content:
-                data['Ad_Pixel_Google'] = 'Yes'
-                
-            # 3. SEO Health
-            if soup.title:
-                data['SEO_Title'] = soup.title.string.strip()[:100]
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc:
-                data['SEO_Description'] = meta_desc.get('content', '').strip()[:150]
-                
-            # 4. Mobile Friendly (Check for viewport meta tag)
-            viewport = soup.find('meta', attrs={'name': 'viewport'})
-            if viewport:
-                data['Mobile_Friendly'] = 'Yes'
-            else:
-                data['Mobile_Friendly'] = 'No'
-                
-        except Exception as e:
-            print(f"  [Website Analysis Failed] {e}")
-            
-        return data
+    @staticmethod
+    def merge_analysis(business_data, analysis):
+        business_data.update(analysis)
+        # Fallback for email if not found on site
+        if not business_data['Email'] and analysis['Email_Found']:
+            business_data['Email'] = analysis['Email_Found']
+        if not business_data['Phone'] and analysis.get('Phone_Found'):
+            business_data['Phone'] = analysis['Phone_Found']
 
-    def extract_details(self, business_elements, keyword, location, should_stop=None):
-        businesses = []
-        urls_to_process = []
-        
+    def collect_urls(self, business_elements, should_stop=None):
+        """PHASE 1: read the place URL out of each collected listing element."""
         print(f"\n[PHASE 1] Collecting URLs from {len(business_elements)} listings...")
         
-        for i, element in enumerate(business_elements):
-            if should_stop and should_stop():
-                print("Scraping aborted during URL collection.")
-                return businesses
-
-            try:
-                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                time.sleep(0.1)
-                try:
-                    link = element.find_element(By.CSS_SELECTOR, "a.hfpxzc")
-                    url = link.get_attribute('href')
-                    if url: urls_to_process.append(url)
-                except: pass
-            except: continue
+        if should_stop and should_stop():
+            print("Scraping aborted during URL collection.")
+            return []
+        
+        return [card['url'] for card in self.harvest_cards(business_elements)]
+    
+    def harvest_cards(self, business_elements=None):
+        """
+        Read URL, name, rating, review count and whether a Website button is shown
+        from result cards in one script call. Harvests the given article elements,
+        or every card loaded in the feed.
+        """
+        try:
+            return read_feed_cards(self.driver, business_elements)
+        except Exception as e:
+            print(f"Error collecting URLs: {e}")
+            return []
+    
+    def extract_details(self, business_elements, keyword, location, should_stop=None):
+        """PHASE 2 for already collected listing elements, run through the same ScrapePipeline as a live scrape."""
+        urls_to_process = self.collect_urls(business_elements, should_stop)
+        if should_stop and should_stop():
+            return []
         
         print(f"\n[PHASE 2] Extracting details from {len(urls_to_process)} businesses...")
+        return ScrapePipeline(self, keyword, location, len(urls_to_process), should_stop=should_stop,
+                              urls=urls_to_process).run()
+    
+    def cached_details(self, url, keyword, location):
+        """Return a fresh cached record for this place (tagged with the current query), or None."""
+        if not self.place_cache:
+            return None
+        cached = self.place_cache.get(url)
+        if cached is None:
+            return None
+        cached.update({'Keyword': keyword, 'City': location})
+        return cached
+    
+    def fetch_details(self, url, keyword, location, should_stop=None, lease=None):
+        """
+        Load one place page on 'lease' (default: this engine's own driver) and
+        extract its Maps fields, unless the place cache already has them.
+        Website analysis is left to the caller.
+        Returns None if stopped or nothing could be extracted.
+        """
+        cached = self.cached_details(url, keyword, location)
+        if cached:
+            print(f"  [CACHED] {cached['Business Name']}")
+            return cached
         
-        for i, url in enumerate(urls_to_process):
-            if should_stop and should_stop():
-                print("Scraping aborted during detail extraction.")
-                return businesses
+        lease = lease or self._lease
+        if not self.rate_limiter.wait(url, should_stop):
+            return None
+        self._open(url, lease)
+        self._wait_for_detail(lease.driver)
+        business_data = self._extract_single_business(keyword, location, url, should_stop, driver=lease.driver)
+        if business_data and business_data['Business Name'] and self.place_cache:
+            self.place_cache.put(url, business_data)
+        return business_data
+    
+    def click_details(self, url, keyword, location, should_stop=None):
+        """
+        Click-through mode: click the result card for 'url', wait for its detail
+        panel to swap in beside the results list, and extract it in place. No
+        navigation or extra tabs, so the feed keeps its scroll position.
+        Returns None if stopped or the panel never showed.
+        """
+        cached = self.cached_details(url, keyword, location)
+        if cached:
+            print(f"  [CACHED] {cached['Business Name']}")
+            return cached
 
-            try:
-                print(f"\nProcessing {i+1}/{len(urls_to_process)}: {url[:60]}...")
-                self.driver.get(url)
-                time.sleep(random.uniform(2, 4))
-                
-                # Basic Data
-                business_data = {
-                    'Business Name': '', 'Category': '', 'Phone': '', 'Email': '', 'Website': '',
-                    'Address': '', 'Rating': '', 'Reviews': '', 'Keyword': keyword, 'City': location,
-                    'Claimed_Status': 'Unknown', 'Business_Hours': '', 'Coordinates': '',
-                    # Advanced fields will be merged here
-                }
-                
-                # 1. Name
-                try: business_data['Business Name'] = self.driver.find_element(By.CSS_SELECTOR, "h1").text.strip()
-                except: pass
-                
-                # 2. Rating/Reviews
-                try: business_data['Rating'] = self.driver.find_element(By.CSS_SELECTOR, "div.F7nice span[aria-hidden='true']").text.strip()
-                except: pass
-                try: business_data['Reviews'] = self.driver.find_element(By.CSS_SELECTOR, "span[aria-label*='reviews']").get_attribute("aria-label").split()[0].replace(',','')
-                except: pass
-                
-                # 3. Category
-                try: business_data['Category'] = self.driver.find_element(By.CSS_SELECTOR, "button.DkEaL").text.strip()
-                except: pass
-                
-                # 4. Claimed Status
-                try:
-                    self.driver.find_element(By.CSS_SELECTOR, "button[data-item-id*='merchant']")
-                    business_data['Claimed_Status'] = 'Unclaimed' # If button exists, it's likely "Claim this business"
-                except:
-                    business_data['Claimed_Status'] = 'Claimed'
+        if not self.rate_limiter.wait(url, should_stop):
+            return None
+        panel = open_detail_panel(self.driver, url)
+        if panel is None:
+            print(f"  Detail panel did not open for {url[:60]}")
+            return None
+        business_data = self._extract_single_business(keyword, location, url, should_stop, root=panel)
+        if business_data and business_data['Business Name'] and self.place_cache:
+            self.place_cache.put(url, business_data)
+        return business_data
 
-                # 5. Coordinates (from URL)
-                try:
-                    curr_url = self.driver.current_url
-                    coords = re.search(r'@(-?\d+\.\d+),(-?\d+\.\d+)', curr_url)
-                    if coords:
-                        business_data['Coordinates'] = f"{coords.group(1)}, {coords.group(2)}"
-                except: pass
+    def _wait_for_detail(self, driver, timeout=10):
+        """Wait for the place panel (heading + action buttons) instead of sleeping after navigation."""
+        wait_until_ready(driver, 'detail', timeout=timeout)
+    
+    def scrape_network(self, keyword, location, max_results, should_stop=None, on_payload=None):
+        """
+        Network extraction mode: search, then read every listing from the JSON
+        payloads Maps loads while the feed is scrolled, without touching the
+        result cards or opening place pages. Needs a driver created with
+        network capture (extraction='network', or a pool with network_capture).
+        Returns business records; website analysis is left to the caller.
+        """
+        NetworkCapture(self.driver).clear()
+        if not self.search(keyword, location):
+            return []
+        return self.collect_network(keyword, location, max_results, should_stop, on_payload)
 
-                # 6. Buttons (Phone, Website, Address)
-                try:
-                    buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[data-item-id], a[data-item-id]")
-                    for btn in buttons:
-                        aria = btn.get_attribute("aria-label") or ""
-                        href = btn.get_attribute("href") or ""
-                        data_id = btn.get_attribute("data-item-id") or ""
-                        
-                        if "phone" in data_id or "tel:" in href:
-                            business_data['Phone'] = aria.replace("Phone: ", "") or btn.text.strip()
-                        elif "authority" in data_id or "http" in href:
-                            if "google" not in href: business_data['Website'] = href
-                        elif "address" in data_id:
-                            business_data['Address'] = aria.replace("Address: ", "") or btn.text.strip()
-                except: pass
-                
-                # 7. Business Hours (Simple extraction)
+    def collect_network(self, keyword, location, max_results, should_stop=None, on_payload=None):
+        """The scrolling half of scrape_network(), for a search that is already open."""
+        places = self.collect_network_places(keyword, location, max_results, should_stop, on_payload)
+        return [record for _, record in places]
+
+    def collect_network_places(self, keyword, location, max_results, should_stop=None, on_payload=None):
+        """Like collect_network(), but as (place URL, record) pairs; the URL is '' when the payload had no IDs."""
+        capture = NetworkCapture(self.driver)
+        places = {}
+        payloads = capture.initial_state()
+        cards = 0
+        idle_rounds = 0
+        while True:
+            payloads += capture.poll()
+            new = 0
+            for url, body in payloads:
+                if on_payload:
+                    on_payload(url, body)
                 try:
-                    hours_btn = self.driver.find_element(By.CSS_SELECTOR, "div[aria-label*='Open']" or "div[aria-label*='Closed']")
-                    business_data['Business_Hours'] = hours_btn.get_attribute("aria-label")
-                except: pass
+                    found = parse_payload(url, body, keyword, location)
+                except ValueError as e:
+                    print(f"  Unreadable payload from {url[:60]}: {e}")
+                    continue
+                for place_url, record in found:
+                    key = listing_key(place_url, record)
+                    if record['Business Name'] and key not in places:
+                        places[key] = (place_url, record)
+                        new += 1
+                        if self.place_cache and place_url:
+                            self.place_cache.put(place_url, record)
+            payloads = []
+            if new:
+                print(f"  {len(places)} listings from network payloads")
 
-                # 8. Deep Website Analysis (The 10 Advanced Features)
-                if business_data['Website']:
-                    print(f"  Analyzing Website: {business_data['Website']}...")
-                    analysis = self.analyze_website(business_data['Website'], should_stop=should_stop)
-                    business_data.update(analysis)
-                    # Fallback for email if not found on site
-                    if not business_data['Email'] and analysis['Email_Found']:
-                        business_data['Email'] = analysis['Email_Found']
-                else:
-                    # Fill empty advanced fields
-                    defaults = {
-                        'Social_Facebook': '', 'Social_Instagram': '', 'Social_LinkedIn': '', 'Social_Twitter': '',
-                        'Email_Found': '', 'Ad_Pixel_FB': 'No', 'Ad_Pixel_Google': 'No',
-                        'SEO_Title': '', 'SEO_Description': '', 'SSL_Secure': 'No', 'Mobile_Friendly': 'Unknown'
-                    }
-                    business_data.update(defaults)
+            if len(places) >= max_results or (should_stop and should_stop()) or idle_rounds >= self.max_idle_scrolls:
+                break
+            state = self.wait_for_more_results(cards)
+            cards = state['count']
+            idle_rounds = idle_rounds + 1 if state['timeout'] and not new else 0
+            if state['end']:
+                payloads = capture.poll()
+                idle_rounds = self.max_idle_scrolls
 
-                if business_data['Business Name']:
-                    businesses.append(business_data)
-                    print(f"  [SUCCESS] {business_data['Business Name']}")
-                    
-            except Exception as e:
-                print(f"  Error processing URL {url}: {e}")
-                continue
-                
-        return businesses
-    
-    def scrape_with_filter(self, keyword, location, max_results, filter_func, should_stop=None):
+        return list(places.values())[:max_results]
+
+    def scrape_with_filter(self, keyword, location, max_results, filter_func, should_stop=None, card_filter=None):
         """
         Smart scraping: continues scrolling and extracting until 'max_results' 
         businesses passing 'filter_func' are found.
+        
+        'card_filter(card)' is an optional pre-filter evaluated against the data
+        already visible in the results card (see harvest_cards). It returns False
+        only when the listing certainly fails 'filter_func', so its detail page is
+        never opened.
         """
         valid_businesses = []
         processed_urls = set()
+        skipped_by_card = 0
         
         try:
-            results_container = self.driver.find_element(By.CSS_SELECTOR, "div[role='feed']")
             scroll_attempts = 0
-            last_count = 0
             
             print(f"Smart Filter Active: Searching for {max_results} qualified businesses...")
             
-            while len(valid_businesses) < max_results and scroll_attempts < 50:
+            while len(valid_businesses) < max_results and scroll_attempts < self.max_idle_scrolls:
                 if should_stop and should_stop():
                     print("Scraping aborted.")
                     return valid_businesses
 
-                # 1. Collect current elements
-                elements = results_container.find_elements(By.CSS_SELECTOR, "div[role='article']")
-                current_count = len(elements)
-                
-                # 2. Process new elements
-                # We only process elements we haven't seen (or process all and skip by URL)
-                # Since we don't have URLs yet, we'll try to process the last batch
-                
-                # Strategy: Process the last N elements that we haven't processed yet
-                # But since we can't easily track elements by ID, we'll just try to process the new ones
-                # Or simpler: Process everything currently visible that hasn't been processed?
-                # Better: Just grab all URLs first? No, we need to extract details to filter.
+                # 1. Harvest every loaded card in one call; process only the ones not seen yet
+                cards = self.harvest_cards()
+                current_count = len(cards)
+                new_cards = [card for card in cards if card['url'] not in processed_urls]
                 
-                # Let's iterate backwards from the end to find new ones?
-                # Or just iterate through all and skip if URL in processed_urls
+                print(f"  Scanning {len(new_cards)} new of {current_count} loaded listings...")
                 
-                print(f"  Scanning {len(elements)} loaded listings...")
-                
-                for element in elements:
+                for card in new_cards:
                     if len(valid_businesses) >= max_results:
                         break
                         
                     if should_stop and should_stop():
                         return valid_businesses
 
+                    url = card['url']
+                    processed_urls.add(url)
+                    
+                    # 2. Fast path: decide from the card when possible
+                    if card_filter and not card_filter(card):
+                        skipped_by_card += 1
+                        print(f"  [SKIP] {card['name'] or url[:40]} (decided from listing card)")
+                        continue
+                    
                     try:
-                        # Get URL to check if processed
-                        try:
-                            link = element.find_element(By.CSS_SELECTOR, "a.hfpxzc")
-                            url = link.get_attribute('href')
-                        except:
-                            continue
-                            
-                        if not url or url in processed_urls:
+                        # 3. Fresh cached record: no page load needed
+                        business_data = self.cached_details(url, keyword, location)
+                        if business_data:
+                            if filter_func(business_data):
+                                valid_businesses.append(business_data)
+                                print(f"  [MATCH] Found {len(valid_businesses)}/{max_results}: {business_data.get('Business Name')} (cached)")
                             continue
-                            
-                        processed_urls.add(url)
                         
-                        # Extract details for this single business
                         print(f"  Checking: {url[:40]}...")
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                        
-                        # We need to click or navigate to get details? 
-                        # The current extract_details navigates to the URL.
-                        # So we should do that here too.
-                        
-                        # Save current handle to return to list?
-                        # Google Maps is SPA, navigating away might lose the list state unless we open in new tab.
-                        # OR: The current extract_details does `self.driver.get(url)`. This resets the list!
-                        # CRITICAL: If we navigate away, we lose the scroll position and the list!
-                        
-                        # SOLUTION: We must collect a batch of URLs, process them, and if we don't have enough,
-                        # we must RE-SEARCH and scroll down to where we left off? That's hard.
-                        # ALTERNATIVE: Open in new tab?
-                        
-                        # Let's try opening in new tab.
+                        if self.extraction == 'click':
+                            # 4a. Open the panel in place; the results list stays where it is
+                            business_data = self.click_details(url, keyword, location, should_stop)
+                            if business_data and filter_func(business_data):
+                                valid_businesses.append(business_data)
+                                print(f"  [MATCH] Found {len(valid_businesses)}/{max_results}: {business_data.get('Business Name')}")
+                            elif business_data:
+                                print(f"  [SKIP] Filter criteria not met.")
+                            continue
+
+                        # 4. Open the place page in a new tab so the results list keeps its scroll state
                         self.driver.execute_script("window.open('');")
                         self.driver.switch_to.window(self.driver.window_handles[-1])
+                        apply_resource_blocking(self.driver, self.block_resources)
                         
                         try:
-                            self.driver.get(url)
-                            time.sleep(random.uniform(1.5, 3))
-                            
-                            # Extract Data (Reuse logic? It's embedded in extract_details loop)
-                            # Let's extract a helper method for single business extraction later?
-                            # For now, inline the extraction logic or call a helper if I can make one.
-                            # I'll copy the extraction logic for safety to avoid breaking existing method.
-                            
-                            business_data = self._extract_single_business(keyword, location, url, should_stop)
+                            business_data = self.fetch_details(url, keyword, location, should_stop)
                             
                             if business_data:
                                 # Apply Filter
@@ -386,111 +420,61 @@ class ScraperEngine:
                             self.driver.switch_to.window(self.driver.window_handles[0])
                             
                     except Exception as e:
-                        print(f"Error processing element: {e}")
+                        print(f"Error processing listing: {e}")
                         continue
 
-                # 3. Scroll for more if needed
+                # 5. Scroll for more if needed
                 if len(valid_businesses) < max_results:
-                    if current_count == last_count:
-                        scroll_attempts += 1
-                    else:
-                        scroll_attempts = 0
-                        last_count = current_count
-                        
-                    if elements:
-                        self.driver.execute_script("arguments[0].scrollIntoView();", elements[-1])
-                        time.sleep(random.uniform(1.5, 2.5))
-                        
+                    state = self.wait_for_more_results(current_count)
+                    scroll_attempts = scroll_attempts + 1 if state['timeout'] else 0
+                    if state['end'] and state['count'] == current_count:
+                        print("  Reached the end of the list.")
+                        break
+            
+            if card_filter:
+                print(f"Card pre-filter skipped {skipped_by_card} of {len(processed_urls)} listings without opening them")
             return valid_businesses
             
         except Exception as e:
             print(f"Error during smart scraping: {str(e)}")
             return valid_businesses
 
-    def _extract_single_business(self, keyword, location, url, should_stop):
-        """Helper to extract data for a single business from current page."""
+    def _extract_single_business(self, keyword, location, url, should_stop, driver=None, root=None):
+        """Helper to extract data for a single business from the driver's current page (or panel 'root')."""
+        driver = driver or self.driver
         try:
-            business_data = {
-                'Business Name': '', 'Category': '', 'Phone': '', 'Email': '', 'Website': '',
-                'Address': '', 'Rating': '', 'Reviews': '', 'Keyword': keyword, 'City': location,
-                'Claimed_Status': 'Unknown', 'Business_Hours': '', 'Coordinates': '',
-            }
-            
-            # 1. Name
-            try: business_data['Business Name'] = self.driver.find_element(By.CSS_SELECTOR, "h1").text.strip()
-            except: pass
-            
-            # 2. Rating/Reviews
-            try: business_data['Rating'] = self.driver.find_element(By.CSS_SELECTOR, "div.F7nice span[aria-hidden='true']").text.strip()
-            except: pass
-            try: business_data['Reviews'] = self.driver.find_element(By.CSS_SELECTOR, "span[aria-label*='reviews']").get_attribute("aria-label").split()[0].replace(',','')
-            except: pass
-            
-            # 3. Category
-            try: business_data['Category'] = self.driver.find_element(By.CSS_SELECTOR, "button.DkEaL").text.strip()
-            except: pass
-            
-            # 4. Claimed Status
-            try:
-                self.driver.find_element(By.CSS_SELECTOR, "button[data-item-id*='merchant']")
-                business_data['Claimed_Status'] = 'Unclaimed'
-            except:
-                business_data['Claimed_Status'] = 'Claimed'
-
-            # 5. Coordinates
-            try:
-                curr_url = self.driver.current_url
-                coords = re.search(r'@(-?\d+\.\d+),(-?\d+\.\d+)', curr_url)
-                if coords:
-                    business_data['Coordinates'] = f"{coords.group(1)}, {coords.group(2)}"
-            except: pass
-
-            # 6. Buttons (Phone, Website, Address)
-            try:
-                buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[data-item-id], a[data-item-id]")
-                for btn in buttons:
-                    aria = btn.get_attribute("aria-label") or ""
-                    href = btn.get_attribute("href") or ""
-                    data_id = btn.get_attribute("data-item-id") or ""
-                    
-                    if "phone" in data_id or "tel:" in href:
-                        business_data['Phone'] = aria.replace("Phone: ", "") or btn.text.strip()
-                    elif "authority" in data_id or "http" in href:
-                        if "google" not in href: business_data['Website'] = href
-                    elif "address" in data_id:
-                        business_data['Address'] = aria.replace("Address: ", "") or btn.text.strip()
-            except: pass
-            
-            # 7. Business Hours
-            try:
-                hours_btn = self.driver.find_element(By.CSS_SELECTOR, "div[aria-label*='Open']" or "div[aria-label*='Closed']")
-                business_data['Business_Hours'] = hours_btn.get_attribute("aria-label")
-            except: pass
+            business_data = extract_detail_panel(driver, keyword, location, root=root)
 
-            # 8. Deep Website Analysis
-            if business_data['Website']:
-                # print(f"  Analyzing Website: {business_data['Website']}...") 
-                # Optimization: Only analyze if we're keeping it? 
-                # No, we might filter based on analysis results (though currently only filtering on existence of website)
-                # For "No Website" filter, if it has a website, we discard it anyway, so no need to analyze!
-                
-                # But if we had other filters, we might need it.
-                # For now, let's defer analysis until AFTER filter check in the main loop?
-                # The filter_func checks 'Website' field.
-                pass
-            else:
-                defaults = {
-                    'Social_Facebook': '', 'Social_Instagram': '', 'Social_LinkedIn': '', 'Social_Twitter': '',
-                    'Email_Found': '', 'Ad_Pixel_FB': 'No', 'Ad_Pixel_Google': 'No',
-                    'SEO_Title': '', 'SEO_Description': '', 'SSL_Secure': 'No', 'Mobile_Friendly': 'Unknown'
-                }
-                business_data.update(defaults)
+            # Website analysis is left to the caller (and skipped entirely when a
+            # filter discards sites that have one); only fill defaults here.
+            if not business_data['Website']:
+                business_data.update(empty_analysis())
 
             return business_data
         except:
             return None
 
-    def close(self):
-        if self.driver:
-            self.driver.quit()
+    def close(self, discard=False):
+        """
+        Release the browser. Pooled drivers go back to the pool for the next job
+        unless 'discard' is set (e.g. on a forced stop), in which case they are quit.
+        """
+        # A forced stop closes from the request thread while the job's own thread may be closing too;
+        # only one of them may hand the lease back
+        with self._close_lock:
+            self.driver = None
+            lease, self._lease = self._lease, None
+            owns_analyzer, self._owns_analyzer = self._owns_analyzer, False
+        if owns_analyzer:
+            self.analyzer.close()
+        if not lease:
+            return
+        if self.pool:
+            if discard:
+                self.pool.discard(lease)
+            else:
+                self.pool.release(lease)
+            print("Browser returned to pool")
+        else:
+            lease.quit()
             print("Browser closed")
@@ -0,0 +1,196 @@
+import re
+
+
+# Reads every detail-panel field in one execute_script round trip instead of
+# a find_element / get_attribute call per field. arguments[0] is an optional
+# root element (e.g. the in-place div[role='main'] panel); defaults to document.
+DETAIL_PANEL_JS = """
+const root = arguments[0] || document;
+const text = (sel) => {
+    const el = root.querySelector(sel);
+    return el ? (el.innerText || el.textContent || '').trim() : '';
+};
+const attr = (sel, name) => {
+    const el = root.querySelector(sel);
+    return el ? (el.getAttribute(name) || '') : '';
+};
+const buttons = Array.from(root.querySelectorAll("button[data-item-id], a[data-item-id]")).map(btn => ({
+    aria: btn.getAttribute('aria-label') || '',
+    href: btn.href || btn.getAttribute('href') || '',
+    data_id: btn.getAttribute('data-item-id') || '',
+    text: (btn.innerText || '').trim()
+}));
+return {
+    name: text('h1'),
+    rating: text("div.F7nice span[aria-hidden='true']"),
+    reviews_label: attr("span[aria-label*='reviews']", 'aria-label'),
+    category: text('button.DkEaL'),
+    has_claim_button: !!root.querySelector("button[data-item-id*='merchant']"),
+    hours_label: attr("div[aria-label*='Open'], div[aria-label*='Closed']", 'aria-label'),
+    url: window.location.href,
+    buttons: buttons
+};
+"""
+
+
+# Click-through mode: clicks the result card linking to arguments[0] and
+# resolves with the in-place detail panel (the div[role='main'] without the
+# feed) once it shows that place's heading and action buttons. Falls back to
+# a heading-only panel, or null, after arguments[1] ms. Runs via
+# execute_async_script; no navigation, so the results list stays put.
+OPEN_DETAIL_PANEL_JS = """
+const url = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+
+const link = Array.from(document.querySelectorAll('a.hfpxzc')).find(a => a.href === url);
+if (!link) {
+    done(null);
+    return;
+}
+const name = (link.getAttribute('aria-label') || '').trim();
+
+const panelFor = (needButtons) => {
+    for (const panel of document.querySelectorAll("div[role='main']")) {
+        if (panel.querySelector("div[role='feed']")) continue;
+        const h1 = panel.querySelector('h1');
+        const title = h1 ? h1.textContent.trim() : '';
+        if (!title || (name && title !== name && panel.getAttribute('aria-label') !== name)) continue;
+        if (!needButtons || panel.querySelector("button[data-item-id], a[data-item-id]")) return panel;
+    }
+    return null;
+};
+
+let finished = false;
+let timer = null;
+const observer = new MutationObserver(() => check());
+
+function finish(panel) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(panel);
+}
+
+function check() {
+    const panel = panelFor(true);
+    if (panel) finish(panel);
+}
+
+link.scrollIntoView({block: 'center'});
+link.click();
+observer.observe(document.body, {childList: true, subtree: true});
+timer = setTimeout(() => finish(panelFor(false)), timeoutMs);
+check();
+"""
+
+
+# Harvests every loaded result card in one round trip. arguments[0] is an
+# optional array of div[role='article'] elements; defaults to the whole feed.
+FEED_HARVEST_JS = """
+let cards = arguments[0];
+if (!cards) {
+    const feed = document.querySelector("div[role='feed']");
+    cards = feed ? Array.from(feed.querySelectorAll("div[role='article']")) : [];
+}
+return cards.map(card => {
+    const link = card.querySelector('a.hfpxzc');
+    const stars = card.querySelector("span[role='img'][aria-label*='star']");
+    const rating = card.querySelector('span.MW4etd');
+    const reviews = card.querySelector('span.UY7F9');
+    const website = card.querySelector("a[data-value='Website'], a[aria-label*='Website' i]");
+    return {
+        url: link ? link.href : '',
+        name: (link && link.getAttribute('aria-label')) || card.getAttribute('aria-label') || '',
+        stars_label: stars ? (stars.getAttribute('aria-label') || '') : '',
+        rating: rating ? rating.textContent.trim() : '',
+        reviews: reviews ? reviews.textContent.trim() : '',
+        has_website: !!website
+    };
+});
+"""
+
+
+def parse_card(raw):
+    """Normalize one FEED_HARVEST_JS entry into url/name/rating/reviews strings plus has_website."""
+    card = {
+        'url': raw.get('url') or '',
+        'name': (raw.get('name') or '').strip(),
+        'rating': (raw.get('rating') or '').strip(),
+        'reviews': re.sub(r'[^\d]', '', raw.get('reviews') or ''),
+        'has_website': bool(raw.get('has_website')),
+    }
+    label = raw.get('stars_label') or ''
+    if label:
+        # e.g. "4.6 stars 1,234 Reviews"
+        if not card['rating']:
+            stars = re.search(r'([\d.,]+)\s*star', label)
+            if stars: card['rating'] = stars.group(1).replace(',', '.')
+        if not card['reviews']:
+            count = re.search(r'([\d,.]+)\s*review', label, re.IGNORECASE)
+            if count: card['reviews'] = re.sub(r'[^\d]', '', count.group(1))
+    return card
+
+
+def read_feed_cards(driver, elements=None):
+    """Return parsed cards (with a place URL) for the given article elements, or the whole feed."""
+    raw_cards = driver.execute_script(FEED_HARVEST_JS, elements) or []
+    return [card for card in (parse_card(raw) for raw in raw_cards) if card['url']]
+
+
+def new_business_record(keyword, location):
+    return {
+        'Business Name': '', 'Category': '', 'Phone': '', 'Email': '', 'Website': '',
+        'Address': '', 'Rating': '', 'Reviews': '', 'Keyword': keyword, 'City': location,
+        'Claimed_Status': 'Unknown', 'Business_Hours': '', 'Coordinates': '',
+    }
+
+
+def parse_detail_payload(payload, keyword, location):
+    """Map the object returned by DETAIL_PANEL_JS onto a business record."""
+    business_data = new_business_record(keyword, location)
+    if not payload:
+        return business_data
+
+    business_data['Business Name'] = payload.get('name') or ''
+    business_data['Rating'] = payload.get('rating') or ''
+    business_data['Category'] = payload.get('category') or ''
+
+    reviews_label = payload.get('reviews_label') or ''
+    if reviews_label:
+        business_data['Reviews'] = reviews_label.split()[0].replace(',', '')
+
+    # If the "Claim this business" button exists, it's unclaimed
+    business_data['Claimed_Status'] = 'Unclaimed' if payload.get('has_claim_button') else 'Claimed'
+
+    coords = re.search(r'@(-?\d+\.\d+),(-?\d+\.\d+)', payload.get('url') or '')
+    if coords:
+        business_data['Coordinates'] = f"{coords.group(1)}, {coords.group(2)}"
+
+    for btn in payload.get('buttons') or []:
+        aria = btn.get('aria') or ''
+        href = btn.get('href') or ''
+        data_id = btn.get('data_id') or ''
+
+        if "phone" in data_id or "tel:" in href:
+            business_data['Phone'] = aria.replace("Phone: ", "") or btn.get('text', '')
+        elif "authority" in data_id or "http" in href:
+            if "google" not in href: business_data['Website'] = href
+        elif "address" in data_id:
+            business_data['Address'] = aria.replace("Address: ", "") or btn.get('text', '')
+
+    business_data['Business_Hours'] = payload.get('hours_label') or ''
+    return business_data
+
+
+def open_detail_panel(driver, url, timeout=10):
+    """Click the result card for 'url' and return its in-place detail panel element (None if it never showed)."""
+    driver.set_script_timeout(timeout + 5)
+    return driver.execute_async_script(OPEN_DETAIL_PANEL_JS, url, int(timeout * 1000))
+
+
+def extract_detail_panel(driver, keyword, location, root=None):
+    """Extract all Maps fields for the place currently shown, in a single WebDriver round trip."""
+    payload = driver.execute_script(DETAIL_PANEL_JS, root)
+    return parse_detail_payload(payload, keyword, location)
@@ -0,0 +1,56 @@
+# Scrolls the results feed to the bottom, then resolves as soon as the number
+# of loaded cards grows past arguments[0], the end-of-list marker shows up, or
+# arguments[1] ms pass with no new cards. Runs via execute_async_script.
+WAIT_FOR_MORE_CARDS_JS = """
+const previous = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+
+const feed = document.querySelector("div[role='feed']");
+if (!feed) {
+    done({count: 0, end: true, timeout: false});
+    return;
+}
+
+const count = () => feed.querySelectorAll("div[role='article']").length;
+const atEnd = () => {
+    if (feed.querySelector('span.HlvSq')) return true;
+    const tail = feed.lastElementChild;
+    return !!tail && /end of the list/i.test(tail.textContent || '');
+};
+
+let finished = false;
+let timer = null;
+const observer = new MutationObserver(() => check());
+
+function finish(timedOut) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done({count: count(), end: atEnd(), timeout: timedOut});
+}
+
+function check() {
+    if (count() > previous || atEnd()) {
+        finish(false);
+        return true;
+    }
+    return false;
+}
+
+feed.scrollTop = feed.scrollHeight;
+if (check()) return;
+observer.observe(feed, {childList: true, subtree: true});
+timer = setTimeout(() => finish(true), timeoutMs);
+"""
+
+
+def wait_for_more_cards(driver, previous_count, idle_timeout=10):
+    """
+    Scroll the feed and block until new cards arrive, the list ends, or
+    'idle_timeout' seconds pass. Returns {'count', 'end', 'timeout'}.
+    """
+    driver.set_script_timeout(idle_timeout + 5)
+    state = driver.execute_async_script(WAIT_FOR_MORE_CARDS_JS, previous_count, int(idle_timeout * 1000))
+    return state or {'count': previous_count, 'end': False, 'timeout': True}
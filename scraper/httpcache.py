@@ -0,0 +1,96 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_DB = os.path.join('cache', 'http.db')
+
+
+class HttpCache:
+    """
+    On-disk cache of website analyses with the validators needed to revalidate them.
+
+    Each entry keeps the ETag / Last-Modified headers, a hash of the body the
+    analysis was computed from, and the analysis itself. Entries younger than
+    'fresh_for' seconds are reused without any request; older ones are
+    revalidated with a conditional GET, and a 304 or an unchanged body hash
+    reuses the stored analysis instead of re-parsing.
+    """
+
+    def __init__(self, path=DEFAULT_DB, fresh_for=24 * 3600):
+        self.path = path
+        self.fresh_for = fresh_for
+        self.counters = {'fresh': 0, 'not_modified': 0, 'unchanged': 0, 'changed': 0, 'new': 0}
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                analysis TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM responses WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry['analysis'] = json.loads(entry['analysis'])
+        return entry
+
+    def is_fresh(self, entry):
+        return bool(self.fresh_for) and time.time() - entry['checked_at'] < self.fresh_for
+
+    def conditional_headers(self, entry):
+        """Request headers that let the server answer 304 Not Modified for this entry."""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url, analysis, etag=None, last_modified=None, digest=None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (url, etag, last_modified, body_hash, analysis, checked_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, digest, json.dumps(analysis), time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, url, etag=None, last_modified=None):
+        """Mark an entry as just revalidated, refreshing validators the server sent back."""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET checked_at = ?, etag = COALESCE(?, etag), '
+                'last_modified = COALESCE(?, last_modified) WHERE url = ?',
+                (time.time(), etag, last_modified, url)
+            )
+            self._conn.commit()
+
+    def count(self, outcome):
+        with self._lock:
+            self.counters[outcome] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
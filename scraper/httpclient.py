@@ -0,0 +1,122 @@
+import asyncio
+import random
+import threading
+from contextlib import asynccontextmanager
+import aiohttp
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_EXCEPTIONS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+
+
+class HttpClient:
+    """
+    Shared outbound HTTP layer for everything in scraper/ that fetches websites.
+
+    Owns a background asyncio loop and one aiohttp session on it, so every
+    request reuses the same keep-alive connection pool ('max_connections'
+    total, 'per_host' per host) and in-process DNS cache ('dns_ttl' seconds).
+    Callers on other threads hand coroutines to submit() and get a
+    concurrent.futures.Future back.
+
+    get() retries connection errors, timeouts and 429/5xx responses up to
+    'retries' times with exponential backoff plus jitter, honouring a numeric
+    Retry-After header up to 'max_backoff' seconds.
+    """
+
+    def __init__(self, max_connections=50, per_host=2, timeout=10, dns_ttl=300, keepalive=30,
+                 retries=2, backoff=0.5, max_backoff=10):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread:
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=True)
+            self._thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._open_session())
+        ready.set()
+        self.loop.run_forever()
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.per_host,
+            keepalive_timeout=self.keepalive,
+            ttl_dns_cache=self.dns_ttl
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    def submit(self, coro):
+        """Run a coroutine on the client's loop; returns a concurrent.futures.Future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        delay = self.backoff * (2 ** attempt)
+        return min(delay + random.uniform(0, delay / 2), self.max_backoff)
+
+    async def _request(self, method, url, **kwargs):
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = await self._session.request(method, url, **kwargs)
+            except RETRY_EXCEPTIONS:
+                if last:
+                    raise
+                await asyncio.sleep(self.retry_delay(attempt))
+                continue
+            if response.status in RETRY_STATUSES and not last:
+                delay = self.retry_delay(attempt, response)
+                response.release()
+                await asyncio.sleep(delay)
+                continue
+            return response
+
+    @asynccontextmanager
+    async def get(self, url, **kwargs):
+        """GET with retries, used as: async with client.get(url) as response."""
+        response = await self._request('GET', url, **kwargs)
+        try:
+            yield response
+        finally:
+            response.release()
+
+    def close(self):
+        with self._lock:
+            if not self._thread:
+                return
+            thread, self._thread = self._thread, None
+
+        async def shutdown():
+            await self._session.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        thread.join(timeout=5)
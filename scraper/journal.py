@@ -0,0 +1,222 @@
+"""
+Checkpoint journal for scrape jobs, so a crashed or stopped job can resume.
+
+Every job records its parameters, each place URL as it is collected
+(with the index its record is saved under) and each extracted record as
+soon as it is exported. Resuming a job reuses the collected URLs, searches
+again for the rest if collection never finished, and skips every listing
+that already has a record.
+
+Usage:
+    python -m scraper.journal list [--limit N]
+    python -m scraper.journal show <job id>
+    python -m scraper.journal export <job id> <file.xlsx|.json>
+    python -m scraper.journal delete <job id>
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+DEFAULT_DB = os.path.join('cache', 'jobs.db')
+
+# jobs(owner=ANY_OWNER) lists the jobs of every owner; owner=None only those without one
+ANY_OWNER = object()
+
+
+class JobJournal:
+    """SQLite journal of job parameters, collected URLs and finished records, keyed by job ID."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                keyword TEXT NOT NULL,
+                location TEXT NOT NULL,
+                max_results INTEGER NOT NULL,
+                options TEXT NOT NULL,
+                owner TEXT,
+                status TEXT NOT NULL,
+                urls_complete INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (job_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                saved_at REAL NOT NULL,
+                PRIMARY KEY (job_id, idx)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_by_owner ON jobs (owner, updated_at);
+        ''')
+
+    def create_job(self, keyword, location, max_results, options=None, owner=None):
+        """Register a new job (for 'owner', e.g. a license key) and return its ID."""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO jobs (job_id, keyword, location, max_results, options, owner, status, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, keyword, location, max_results, json.dumps(options or {}), owner, 'running', now, now)
+            )
+            self._conn.commit()
+        return job_id
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['options'] = json.loads(job['options'])
+        return job
+
+    def set_status(self, job_id, status):
+        with self._lock:
+            self._conn.execute('UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?',
+                               (status, time.time(), job_id))
+            self._conn.commit()
+
+    def add_url(self, job_id, idx, url):
+        """Checkpoint one collected place URL; 'idx' is the index its record is saved under."""
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO urls (job_id, idx, url) VALUES (?, ?, ?)', (job_id, idx, url))
+            self._conn.execute('UPDATE jobs SET updated_at = ? WHERE job_id = ?', (time.time(), job_id))
+            self._conn.commit()
+
+    def finish_urls(self, job_id):
+        """Mark the collected URLs as the job's complete listing."""
+        with self._lock:
+            self._conn.execute('UPDATE jobs SET urls_complete = 1, updated_at = ? WHERE job_id = ?',
+                               (time.time(), job_id))
+            self._conn.commit()
+
+    def collected_urls(self, job_id):
+        """URLs collected so far in index order, whether or not collection finished."""
+        with self._lock:
+            rows = self._conn.execute('SELECT url FROM urls WHERE job_id = ? ORDER BY idx', (job_id,)).fetchall()
+        return [row['url'] for row in rows]
+
+    def urls(self, job_id):
+        """Collected URLs in listing order, or None if collection never finished."""
+        with self._lock:
+            job = self._conn.execute('SELECT urls_complete FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if job is None or not job['urls_complete']:
+            return None
+        return self.collected_urls(job_id) or None
+
+    def save_record(self, job_id, idx, record):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO records (job_id, idx, data, saved_at) VALUES (?, ?, ?, ?)',
+                (job_id, idx, json.dumps(record), time.time())
+            )
+            self._conn.execute('UPDATE jobs SET updated_at = ? WHERE job_id = ?', (time.time(), job_id))
+            self._conn.commit()
+
+    def records(self, job_id):
+        """{index: record} of every listing finished so far."""
+        with self._lock:
+            rows = self._conn.execute('SELECT idx, data FROM records WHERE job_id = ? ORDER BY idx',
+                                      (job_id,)).fetchall()
+        return {row['idx']: json.loads(row['data']) for row in rows}
+
+    def jobs(self, limit=20, owner=ANY_OWNER):
+        """The most recently updated jobs, of every owner or only of 'owner'."""
+        where, params = ('', ()) if owner is ANY_OWNER else ('WHERE j.owner IS ?', (owner,))
+        with self._lock:
+            rows = self._conn.execute(f'''
+                SELECT j.*,
+                       (SELECT COUNT(*) FROM urls u WHERE u.job_id = j.job_id) AS collected,
+                       (SELECT COUNT(*) FROM records r WHERE r.job_id = j.job_id) AS finished
+                FROM jobs j {where} ORDER BY j.updated_at DESC LIMIT ?
+            ''', params + (limit,)).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            job['options'] = json.loads(job['options'])
+            jobs.append(job)
+        return jobs
+
+    def delete(self, job_id):
+        with self._lock:
+            for table in ('records', 'urls', 'jobs'):
+                self._conn.execute(f'DELETE FROM {table} WHERE job_id = ?', (job_id,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m scraper.journal', description='Inspect checkpointed scrape jobs.')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'journal database (default: {DEFAULT_DB})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    list_cmd = sub.add_parser('list', help='list recent jobs')
+    list_cmd.add_argument('--limit', type=int, default=20)
+    show_cmd = sub.add_parser('show', help='print one job and its progress')
+    show_cmd.add_argument('job_id')
+    export_cmd = sub.add_parser('export', help='write the records a job finished so far')
+    export_cmd.add_argument('job_id')
+    export_cmd.add_argument('path', help='.xlsx or .json')
+    delete_cmd = sub.add_parser('delete', help='drop a job and its checkpoints')
+    delete_cmd.add_argument('job_id')
+    args = parser.parse_args(argv)
+
+    journal = JobJournal(args.db)
+    try:
+        if args.command == 'list':
+            for job in journal.jobs(args.limit):
+                updated = time.strftime('%Y-%m-%d %H:%M', time.localtime(job['updated_at']))
+                print(f"{job['job_id']}  {job['status']:<10} {job['finished']:>4}/{job['collected'] or job['max_results']:<4} "
+                      f"{updated}  {job['keyword']} in {job['location']}")
+            return 0
+
+        job = journal.get_job(args.job_id)
+        if job is None:
+            print("No such job")
+            return 1
+        if args.command == 'show':
+            job['collected'] = len(journal.collected_urls(args.job_id))
+            job['finished'] = len(journal.records(args.job_id))
+            print(json.dumps(job, indent=2))
+        elif args.command == 'export':
+            records = [record for _, record in sorted(journal.records(args.job_id).items())]
+            if args.path.lower().endswith('.xlsx'):
+                from data.exporter import DataExporter
+                DataExporter().export_to_excel(records, args.path)
+            else:
+                with open(args.path, 'w', encoding='utf-8') as f:
+                    json.dump(records, f, ensure_ascii=False, indent=2)
+            print(f"Wrote {len(records)} records to {args.path}")
+        elif args.command == 'delete':
+            journal.delete(args.job_id)
+            print(f"Deleted job {args.job_id}")
+    finally:
+        journal.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,256 @@
+"""
+Listing extraction from the JSON payloads Maps loads over the network.
+
+Instead of querying rendered result cards, the driver's performance log
+(Chrome DevTools Network events) is read for the search / place responses
+Maps fetches, and every listing in a payload is parsed straight from the
+JSON. The first page of results is embedded in the page as
+window.APP_INITIALIZATION_STATE; later pages arrive as /search?tbm=map XHRs
+while the feed is scrolled.
+
+Usage:
+    python -m scraper.network parse <payload file> [...]     # offline, e.g. fixtures/maps/*.txt
+                                                             # (files named place_* are place responses)
+    python -m scraper.network record "<keyword>" "<location>" [--out DIR] [--max N]
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from .extractors import new_business_record
+from .cache import place_id_from_url
+
+
+# Response URLs that carry listing payloads
+PAYLOAD_URL = re.compile(r'google\.[a-z.]+/(?:search\?.*tbm=map|maps/preview/place)')
+
+# Anti-XSSI prefix Google puts in front of JSON responses
+XSSI_PREFIX = ")]}'"
+
+INITIAL_STATE_JS = "return JSON.stringify(window.APP_INITIALIZATION_STATE || null);"
+
+
+def enable_network_capture(chrome_options):
+    """Turn on the performance log Chrome DevTools Network events are read from."""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+
+def _dig(obj, *path):
+    """obj[path[0]][path[1]]..., or None as soon as a step is missing."""
+    for key in path:
+        try:
+            obj = obj[key]
+        except (IndexError, KeyError, TypeError):
+            return None
+    return obj
+
+
+def load_payload(text):
+    """Parse a payload body: strips the XSSI prefix and the {"d": "..."} wrapper newer responses use."""
+    text = text.strip()
+    if text.endswith('/*""*/'):
+        text = text[:-len('/*""*/')]
+    if text.startswith('{'):
+        text = json.loads(text).get('d', '')
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    return json.loads(text)
+
+
+def place_url(info):
+    """Maps place URL carrying the feature ID (!1s) and ChIJ place ID (!19s) that PlaceCache keys on."""
+    feature_id, place_id = _dig(info, 10), _dig(info, 78)
+    if not (feature_id or place_id):
+        return ''
+    data = f"!4m2!3m1!1s{feature_id}" if feature_id else ''
+    if place_id:
+        data += f"!19s{place_id}"
+    return f"https://www.google.com/maps/place/data={data}"
+
+
+def parse_place(info, keyword, location):
+    """Map one place array (the listing inside a search entry or a place response) onto a business record."""
+    record = new_business_record(keyword, location)
+    record['Business Name'] = _dig(info, 11) or ''
+    categories = _dig(info, 13) or []
+    record['Category'] = categories[0] if categories else ''
+
+    rating, reviews = _dig(info, 4, 7), _dig(info, 4, 8)
+    record['Rating'] = str(rating) if rating is not None else ''
+    record['Reviews'] = str(reviews) if reviews is not None else ''
+
+    website = _dig(info, 7, 0) or ''
+    if website.startswith('/url?q='):
+        website = website[len('/url?q='):].split('&')[0]
+    if 'google.' not in website:
+        record['Website'] = website
+
+    record['Phone'] = _dig(info, 178, 0, 0) or ''
+    record['Address'] = _dig(info, 39) or ', '.join(_dig(info, 2) or [])
+
+    lat, lng = _dig(info, 9, 2), _dig(info, 9, 3)
+    if lat is not None and lng is not None:
+        record['Coordinates'] = f"{lat}, {lng}"
+
+    hours = _dig(info, 34, 1) or []
+    record['Business_Hours'] = '; '.join(
+        f"{day[0]}: {', '.join(day[1])}" for day in hours if _dig(day, 0) and isinstance(_dig(day, 1), list)
+    )
+    return record
+
+
+def _place_arrays(payload):
+    """Every listing array in a search payload, wherever the current response layout puts them."""
+    if isinstance(payload, list):
+        info = _dig(payload, 14)
+        if isinstance(info, list) and isinstance(_dig(info, 11), str):
+            yield info
+            return
+        for item in payload:
+            yield from _place_arrays(item)
+
+
+def parse_search_payload(payload, keyword, location):
+    """All listings in a search payload as (place URL, business record) pairs."""
+    if isinstance(payload, str):
+        payload = load_payload(payload)
+    return [(place_url(info), parse_place(info, keyword, location)) for info in _place_arrays(payload)]
+
+
+def parse_place_payload(payload, keyword, location):
+    """A single /maps/preview/place response as a (place URL, business record) pair."""
+    if isinstance(payload, str):
+        payload = load_payload(payload)
+    info = _dig(payload, 6)
+    if not isinstance(info, list):
+        return None
+    return place_url(info), parse_place(info, keyword, location)
+
+
+def parse_payload(url, body, keyword, location):
+    """Dispatch on the response URL; returns a list of (place URL, record) pairs."""
+    payload = load_payload(body)
+    if '/maps/preview/place' in url:
+        place = parse_place_payload(payload, keyword, location)
+        return [place] if place else []
+    return parse_search_payload(payload, keyword, location)
+
+
+def listing_key(url, record):
+    """Identity of a listing across payloads: its place ID, or name and address when the payload had no IDs."""
+    return place_id_from_url(url) or (record['Business Name'], record['Address'])
+
+
+def embedded_payloads(state):
+    """Payload strings (XSSI-prefixed JSON) nested anywhere in APP_INITIALIZATION_STATE."""
+    if isinstance(state, str):
+        if state.startswith(XSSI_PREFIX):
+            yield state
+    elif isinstance(state, list):
+        for item in state:
+            yield from embedded_payloads(item)
+
+
+class NetworkCapture:
+    """
+    Reads Maps listing payloads off a driver's performance log.
+
+    The driver must have been created with enable_network_capture(). Response
+    bodies are fetched over CDP (Network.getResponseBody) once Chrome reports
+    the request finished.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._pending = {}
+
+    def clear(self):
+        self.driver.get_log('performance')
+        self._pending.clear()
+
+    def initial_state(self):
+        """Payloads embedded in the current page rather than fetched by XHR."""
+        raw = self.driver.execute_script(INITIAL_STATE_JS)
+        return [('initial_state', body) for body in embedded_payloads(json.loads(raw))] if raw else []
+
+    def poll(self):
+        """(url, body) for every listing response finished since the last poll."""
+        finished = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.responseReceived':
+                url = params.get('response', {}).get('url', '')
+                if PAYLOAD_URL.search(url):
+                    self._pending[params['requestId']] = url
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                url = self._pending.pop(params['requestId'])
+                try:
+                    body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                except Exception:
+                    continue
+                finished.append((url, body.get('body', '')))
+        return finished
+
+
+def _record(keyword, location, out_dir, max_results):
+    from .engine import ScraperEngine
+
+    os.makedirs(out_dir, exist_ok=True)
+    engine = ScraperEngine(headless=True, extraction='network')
+    try:
+        captured = []
+        engine.scrape_network(keyword, location, max_results, on_payload=lambda url, body: captured.append(body))
+        stem = re.sub(r'\W+', '_', f"{keyword}_{location}".lower()).strip('_')
+        for i, body in enumerate(captured):
+            path = os.path.join(out_dir, f"{stem}_{i}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(body)
+            print(f"Saved {path}")
+    finally:
+        engine.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m scraper.network',
+                                     description='Parse recorded Maps payloads, or record new ones.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    parse_cmd = sub.add_parser('parse', help='print the listings in recorded payload files')
+    parse_cmd.add_argument('files', nargs='+')
+    record_cmd = sub.add_parser('record', help='run a live search and save every listing payload')
+    record_cmd.add_argument('keyword')
+    record_cmd.add_argument('location')
+    record_cmd.add_argument('--out', default=os.path.join('fixtures', 'maps'))
+    record_cmd.add_argument('--max', type=int, default=40)
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        _record(args.keyword, args.location, args.out, args.max)
+        return 0
+
+    unique = set()
+    for path in args.files:
+        with open(path, encoding='utf-8') as f:
+            body = f.read()
+        kind = '/maps/preview/place' if os.path.basename(path).startswith('place') else '/search?tbm=map'
+        start = time.perf_counter()
+        places = parse_payload(kind, body, '', '')
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n{path}: {len(places)} listings in {elapsed:.1f} ms")
+        for url, record in places:
+            unique.add(listing_key(url, record))
+            print(f"  {record['Business Name']:<35} {record['Rating']:>4} ({record['Reviews']:>5})  "
+                  f"{record['Phone']:<16} {record['Website'] or '-'}")
+    if len(args.files) > 1:
+        print(f"\n{len(unique)} unique listings across {len(args.files)} files")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
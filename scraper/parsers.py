@@ -0,0 +1,125 @@
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as LexborParser
+except ImportError:
+    LexborParser = None
+
+
+class PageSummary:
+    """The handful of things website analysis needs from a page."""
+
+    def __init__(self):
+        self.links = []
+        self.title = ''
+        self.description = None
+        self.has_viewport = False
+
+
+class _SummaryParser(HTMLParser):
+    """
+    Event-driven summary of a page: anchors are collected as they stream past,
+    and <title>/<meta> are only considered inside <head>.
+    """
+
+    def __init__(self, summary):
+        super().__init__(convert_charrefs=True)
+        self.summary = summary
+        self.in_head = True
+        self.in_title = False
+        self.title_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href' and value is not None:
+                    self.summary.links.append(value)
+                    break
+        elif not self.in_head:
+            return
+        elif tag == 'body':
+            self.in_head = False
+        elif tag == 'title' and not self.summary.title:
+            self.in_title = True
+        elif tag == 'meta':
+            attrs = dict(attrs)
+            name = (attrs.get('name') or '').lower()
+            if name == 'description' and self.summary.description is None:
+                self.summary.description = attrs.get('content') or ''
+            elif name == 'viewport':
+                self.summary.has_viewport = True
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self.in_title:
+            self.in_title = False
+            self.summary.title = ''.join(self.title_parts)
+        elif tag == 'head':
+            self.in_head = False
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title_parts.append(data)
+
+
+def summarize_stream(html):
+    summary = PageSummary()
+    parser = _SummaryParser(summary)
+    parser.feed(html)
+    parser.close()
+    if parser.in_title:
+        summary.title = ''.join(parser.title_parts)
+    return summary
+
+
+def _meta_name(name):
+    """bs4 attribute matcher for a <meta name> compared case-insensitively, as HTML does."""
+    return lambda value: value is not None and value.lower() == name
+
+
+def summarize_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    summary = PageSummary()
+    summary.links = [a.get('href') for a in soup.find_all('a', href=True)]
+    if soup.title and soup.title.string:
+        summary.title = soup.title.string
+    meta_desc = soup.find('meta', attrs={'name': _meta_name('description')})
+    if meta_desc:
+        summary.description = meta_desc.get('content', '')
+    summary.has_viewport = soup.find('meta', attrs={'name': _meta_name('viewport')}) is not None
+    return summary
+
+
+def summarize_selectolax(html):
+    tree = LexborParser(html)
+    summary = PageSummary()
+    summary.links = [a.attributes.get('href') for a in tree.css('a[href]') if a.attributes.get('href') is not None]
+    title = tree.css_first('title')
+    if title:
+        summary.title = title.text()
+    meta_desc = tree.css_first('meta[name="description" i]')
+    if meta_desc:
+        summary.description = meta_desc.attributes.get('content') or ''
+    summary.has_viewport = tree.css_first('meta[name="viewport" i]') is not None
+    return summary
+
+
+PARSER_BACKENDS = {
+    'bs4': summarize_bs4,
+    'stream': summarize_stream,
+}
+if LexborParser is not None:
+    PARSER_BACKENDS['selectolax'] = summarize_selectolax
+
+
+def default_backend():
+    """Fastest backend available: selectolax if installed, else the stdlib streaming parser."""
+    return 'selectolax' if 'selectolax' in PARSER_BACKENDS else 'stream'
+
+
+def summarize(html, backend=None):
+    """Summarize a page with the named backend ('stream', 'bs4' or 'selectolax')."""
+    backend = backend or default_backend()
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown or unavailable parser backend: {backend}")
+    return PARSER_BACKENDS[backend](html)
@@ -0,0 +1,337 @@
+import queue
+import threading
+import time
+from .analyzer import empty_analysis
+from .cache import place_id_from_url
+from .network import listing_key
+
+
+_DONE = object()
+
+
+def _place_key(url, record=None):
+    """What identifies a listing across searches: its place ID, else the URL, else its name and address."""
+    if url:
+        return place_id_from_url(url) or url
+    return listing_key(url, record)
+
+
+class Stage:
+    """
+    One pipeline stage: a bounded input queue drained by its own worker threads.
+
+    'handler(item, emit, worker_index)' processes one item and calls 'emit' for
+    every output it produces. 'emit' blocks while the next stage's queue is
+    full, which is how backpressure propagates upstream.
+    """
+
+    def __init__(self, name, handler, workers=1, maxsize=50, gates=None):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue = queue.Queue(maxsize)
+        self.downstream = None
+        self.gates = gates or {}
+        self.processed = 0
+        self.errors = 0
+        self.done = threading.Event()
+        self._threads = []
+        self._active = 0
+        self._started_at = None
+        self._finished_at = None
+        self._lock = threading.Lock()
+
+    def put(self, item):
+        self.queue.put(item)
+
+    def _emit(self, item):
+        if self.downstream:
+            self.downstream.put(item)
+
+    def start(self):
+        self._started_at = time.time()
+        self._active = self.workers
+        self._threads = [
+            threading.Thread(target=self._work, args=(i,), daemon=True, name=f"{self.name}-{i}")
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _work(self, index):
+        # A gated worker does not take items until its event is set
+        gate = self.gates.get(index)
+        if gate:
+            gate.wait()
+        try:
+            self._drain(index)
+        finally:
+            with self._lock:
+                self._active -= 1
+                if self._active == 0:
+                    self._finished_at = time.time()
+                    self.done.set()
+
+    def _drain(self, index):
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                return
+            try:
+                self.handler(item, self._emit, index)
+                with self._lock:
+                    self.processed += 1
+            except Exception as e:
+                print(f"  [{self.name}] {e}")
+                with self._lock:
+                    self.errors += 1
+
+    def finish(self):
+        """Signal that no more input is coming; workers exit once the queue drains."""
+        for _ in self._threads:
+            self.queue.put(_DONE)
+
+    def join(self):
+        for t in self._threads:
+            t.join()
+
+    def stats(self):
+        elapsed = ((self._finished_at or time.time()) - self._started_at) if self._started_at else 0
+        return {
+            'workers': self.workers,
+            'queue_depth': self.queue.qsize(),
+            'processed': self.processed,
+            'errors': self.errors,
+            'throughput': round(self.processed / elapsed, 2) if elapsed else 0.0,
+            'done': self.done.is_set()
+        }
+
+
+class ScrapePipeline:
+    """
+    Staged scrape: collector -> detail extractor -> website analyzer -> exporter.
+
+    Each stage runs its own workers behind a bounded queue, so the browser
+    never waits on website HTTP and vice versa. Call engine.search() first,
+    then run(); stats() can be polled from another thread while it runs.
+
+    With an engine in network extraction mode the collector reads complete
+    listings from the Maps payloads, and in click mode it opens each card's
+    detail panel in place; either way the detail stage is skipped.
+
+    Pass 'urls' (e.g. from a GeoTiler) to skip scrolling and feed those place
+    URLs straight to the detail stage.
+
+    With a JobJournal and 'job_id', the collected URLs and every exported
+    record are checkpointed as they happen; running the same job ID again
+    reuses the URLs and only processes listings without a record. A job
+    stopped before collection finished searches again for the rest, matching
+    listings by place ID. In network mode the URLs are those of the parsed
+    listings, so a resumed job with a complete list skips the search and takes
+    the remaining listings' records from the place cache.
+
+    The collector scrolls with the engine's own driver and emits each scroll
+    round's new cards as they load. Detail worker 0 reuses that driver once
+    collection is over; further detail workers check out extra drivers from
+    the engine's pool and work on place pages while the feed still scrolls.
+    """
+
+    def __init__(self, engine, keyword, location, max_results, should_stop=None, on_record=None,
+                 detail_workers=None, analyzer_workers=8, queue_size=50, urls=None, journal=None, job_id=None):
+        self.engine = engine
+        self.keyword = keyword
+        self.location = location
+        self.max_results = max_results
+        self.should_stop = should_stop or (lambda: False)
+        self.on_record = on_record
+        self.detail_workers = detail_workers or engine.detail_workers
+        self.analyzer_workers = analyzer_workers
+        self.queue_size = queue_size
+        self.urls = urls
+        self.journal = journal
+        self.job_id = job_id
+        self.records = {}
+        self.resumed = 0
+        self._known = []
+        self._complete = False
+        self.stages = []
+        self._leases = []
+
+    def _listing_urls(self):
+        """
+        (index, place URL) of every listing to process, yielded as it becomes known.
+
+        A resumed job first replays the URLs it journaled; unless that list was
+        complete, the given URLs or each scroll round's new cards follow, minus
+        listings it already has. Every new URL is journaled with its index before
+        it is yielded, so no record is checkpointed for a listing the journal
+        can't name; the list is marked complete at the end.
+        """
+        yield from ((index, url) for index, url in enumerate(self._known) if url)
+        if self._complete:
+            return
+        index = len(self._known)
+        if index >= self.max_results:
+            return
+        seen = {_place_key(url) for url in self._known if url}
+        if self.urls is not None:
+            source = self.urls
+        else:
+            # Results may come back in another order; listings seen before don't count towards max_results
+            source = (card['url'] for card in self.engine.stream_cards(self.max_results + index,
+                                                                       should_stop=self.should_stop))
+        for url in source:
+            key = _place_key(url)
+            if key in seen:
+                continue
+            seen.add(key)
+            if self.journal:
+                self.journal.add_url(self.job_id, index, url)
+            yield index, url
+            index += 1
+            if index >= self.max_results:
+                break
+        if self.journal and not self.should_stop():
+            self.journal.finish_urls(self.job_id)
+
+    def _collect(self, item, emit, worker):
+        for index, url in self._listing_urls():
+            if self.should_stop():
+                return
+            if index not in self.records:
+                emit((index, url))
+
+    def _collect_network(self, item, emit, worker):
+        places = self.engine.collect_network_places(self.keyword, self.location, self.max_results,
+                                                    should_stop=self.should_stop)
+        # Journaled listings keep their index; one without a URL is only known by its finished record
+        known = {}
+        for index, url in enumerate(self._known):
+            if url or index in self.records:
+                known[_place_key(url, self.records.get(index))] = index
+        next_index = len(self._known)
+        complete = True
+        for url, business_data in places:
+            if self.should_stop():
+                return
+            index = known.get(_place_key(url, business_data))
+            if index is None:
+                if next_index >= self.max_results:
+                    continue
+                index, next_index = next_index, next_index + 1
+                if self.journal:
+                    self.journal.add_url(self.job_id, index, url)
+            complete = complete and bool(url)
+            if index not in self.records:
+                emit((index, business_data))
+        # A resumed job opens these URLs like any other (PlaceCache already holds their records);
+        # without a URL for every listing the list is left incomplete and a resume searches again
+        if self.journal and complete and not self.should_stop():
+            self.journal.finish_urls(self.job_id)
+
+    def _collect_clicks(self, item, emit, worker):
+        # Clicking drives the same feed that is being scrolled, so scroll to the end first
+        for index, url in list(self._listing_urls()):
+            if self.should_stop():
+                return
+            if index in self.records:
+                continue
+            print(f"\nProcessing {index+1}: {url[:60]}...")
+            business_data = self.engine.click_details(url, self.keyword, self.location, self.should_stop)
+            if business_data and business_data['Business Name']:
+                emit((index, business_data))
+
+    def _extract(self, item, emit, worker):
+        index, url = item
+        if self.should_stop():
+            return
+        # Worker 0 drives the collector's own browser (it is gated until collection ends)
+        lease = self._leases[worker - 1] if worker else None
+        print(f"\nProcessing {index+1}: {url[:60]}...")
+        business_data = self.engine.fetch_details(url, self.keyword, self.location, self.should_stop, lease=lease)
+        if not business_data or not business_data['Business Name']:
+            return
+        emit((index, business_data))
+
+    def _analyze(self, item, emit, worker):
+        index, business_data = item
+        if business_data['Website'] and not self.should_stop():
+            print(f"  Analyzing Website: {business_data['Website']}...")
+            business_data.update(empty_analysis())
+            analysis = self.engine.analyze_website(business_data['Website'], should_stop=self.should_stop)
+            self.engine.merge_analysis(business_data, analysis)
+        emit((index, business_data))
+
+    def _export(self, item, emit, worker):
+        index, business_data = item
+        self.records[index] = business_data
+        if self.journal:
+            self.journal.save_record(self.job_id, index, business_data)
+        print(f"  [SUCCESS] {business_data['Business Name']}")
+        if self.on_record:
+            self.on_record(business_data)
+
+    def run(self):
+        """Run every stage to completion and return the records in listing order."""
+        if self.journal:
+            # Resuming: reuse the journaled URLs and skip every listing already finished
+            self.records = self.journal.records(self.job_id)
+            self.resumed = len(self.records)
+            self._known = self.journal.collected_urls(self.job_id)
+            checkpointed = self.journal.urls(self.job_id)
+            if checkpointed:
+                self.urls = checkpointed
+                self._complete = True
+            if self.resumed:
+                print(f"Resuming job {self.job_id}: {self.resumed} listings already done")
+
+        if self.engine.extraction == 'network' and self.urls is None:
+            # Listings come complete from the search payloads; there are no place pages to open
+            self.stages = [
+                Stage('collector', self._collect_network, workers=1, maxsize=1),
+                Stage('analyzer', self._analyze, workers=self.analyzer_workers, maxsize=self.queue_size),
+                Stage('exporter', self._export, workers=1, maxsize=self.queue_size),
+            ]
+            return self._run_stages()
+
+        if self.engine.extraction == 'click' and self.urls is None:
+            # One browser clicks through the cards itself, so the collector also extracts
+            self.stages = [
+                Stage('collector', self._collect_clicks, workers=1, maxsize=1),
+                Stage('analyzer', self._analyze, workers=self.analyzer_workers, maxsize=self.queue_size),
+                Stage('exporter', self._export, workers=1, maxsize=self.queue_size),
+            ]
+            return self._run_stages()
+
+        self._leases = self.engine.checkout_workers(max(self.detail_workers, 1) - 1)
+        detail_count = 1 + len(self._leases)
+
+        collector = Stage('collector', self._collect, workers=1, maxsize=1)
+        self.stages = [
+            collector,
+            # URLs are tiny and capped by max_results; leave this queue unbounded so the
+            # collector never blocks on it while detail worker 0 is still gated
+            Stage('detail', self._extract, workers=detail_count, maxsize=0, gates={0: collector.done}),
+            Stage('analyzer', self._analyze, workers=self.analyzer_workers, maxsize=self.queue_size),
+            Stage('exporter', self._export, workers=1, maxsize=self.queue_size),
+        ]
+        try:
+            return self._run_stages()
+        finally:
+            self.engine.return_workers(self._leases)
+            self._leases = []
+
+    def _run_stages(self):
+        for upstream, downstream in zip(self.stages, self.stages[1:]):
+            upstream.downstream = downstream
+        for stage in self.stages:
+            stage.start()
+        self.stages[0].put(None)
+        for stage in self.stages:
+            stage.finish()
+            stage.join()
+        return [self.records[i] for i in sorted(self.records)]
+
+    def stats(self):
+        """Per-stage queue depth, processed count and throughput (items/second)."""
+        return {stage.name: stage.stats() for stage in self.stages}
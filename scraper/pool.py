@@ -0,0 +1,356 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+import atexit
+import queue
+import threading
+import time
+from .utils import get_random_user_agent
+from .network import enable_network_capture
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Origins whose site storage is wiped between jobs (cookies are cleared for every domain)
+RESET_ORIGINS = ('https://www.google.com', 'https://consent.google.com')
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_driver_path():
+    """Resolve the chromedriver binary once per process instead of once per engine."""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+    return _driver_path
+
+
+# Resources the scraper never looks at, by category, as Network.setBlockedURLs wildcard patterns
+BLOCKED_RESOURCES = {
+    'images': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.ico*', '*.bmp*',
+               '*googleusercontent.com/*', '*gstatic.com/images/*'],
+    'fonts': ['*.woff*', '*.ttf*', '*.otf*', '*fonts.gstatic.com/*', '*fonts.googleapis.com/*'],
+    'media': ['*.mp4*', '*.webm*', '*.mp3*', '*.ogg*'],
+    'tiles': ['*/maps/vt?*', '*/maps/vt/*', '*/kh/v=*', '*khms*.google.com/*', '*streetviewpixels*',
+              '*/maps/preview/photo*', '*/maps/rpc/photo*'],
+    'analytics': ['*google-analytics.com/*', '*googletagmanager.com/*', '*doubleclick.net/*',
+                  '*/gen_204*', '*/log?format=*', '*play.google.com/log*', '*/maps/preview/log*'],
+}
+
+# Profiles: which categories to drop. The results feed and place panel only need HTML/JS/XHR.
+BLOCKING_PROFILES = {
+    'off': (),
+    'media': ('images', 'fonts', 'media'),
+    'maps': ('images', 'fonts', 'media', 'tiles', 'analytics'),
+}
+
+
+def blocked_url_patterns(profile):
+    if profile not in BLOCKING_PROFILES:
+        raise ValueError(f"Unknown resource blocking profile: {profile}")
+    return [pattern for category in BLOCKING_PROFILES[profile] for pattern in BLOCKED_RESOURCES[category]]
+
+
+def apply_resource_blocking(driver, profile):
+    """
+    Block the profile's resources in the current tab over CDP. Blocking is per
+    tab, so call it again after switching to a newly opened one.
+    """
+    patterns = blocked_url_patterns(profile or 'off')
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    except Exception as e:
+        print(f"Could not apply resource blocking: {e}")
+
+
+def create_driver(headless=True, network_capture=False, block_resources=None, page_load_strategy='normal'):
+    """
+    Launch a Chrome WebDriver with options and user agent rotation.
+    'block_resources' names a BLOCKING_PROFILES entry to drop unused page resources.
+    With page_load_strategy 'eager' or 'none', get() returns before the page has
+    fully loaded and callers wait on readiness checks (see readiness.py) instead.
+    """
+    chrome_options = Options()
+    chrome_options.page_load_strategy = page_load_strategy
+    if headless:
+        chrome_options.add_argument('--headless=new')
+    if network_capture:
+        enable_network_capture(chrome_options)
+    if 'images' in BLOCKING_PROFILES.get(block_resources or 'off', ()):
+        # Also stops image decoding, which URL blocking alone doesn't catch for data: URIs
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+
+    user_agent = get_random_user_agent()
+    chrome_options.add_argument(f'user-agent={user_agent}')
+
+    # Anti-detection
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--window-size=1920,1080')
+
+    service = Service(get_driver_path())
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    apply_resource_blocking(driver, block_resources)
+    return driver
+
+
+class PooledDriver:
+    """A warm Chrome instance plus the usage counters the pool recycles on."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.jobs = 0
+        self.created_at = time.time()
+
+    def rss_mb(self):
+        """Resident memory of chromedriver and all Chrome children, or None if unknown."""
+        if psutil is None:
+            return None
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            procs = [root] + root.children(recursive=True)
+            total = 0
+            for proc in procs:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total / (1024 * 1024)
+        except Exception:
+            return None
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """
+    Keeps a fixed number of pre-launched Chrome drivers warm and hands them out to jobs.
+
+    Drivers are health-checked on acquire, reset (tabs, cookies, storage) on
+    release, and recycled once they exceed 'max_pages' navigations or
+    'max_rss_mb' of resident memory. With 'network_capture' every driver
+    keeps a performance log for the network extraction mode; 'block_resources'
+    is the resource blocking profile and 'page_load_strategy' the WebDriver
+    page-load strategy every driver is launched with.
+    """
+
+    def __init__(self, size=2, headless=True, max_pages=300, max_rss_mb=1500, acquire_timeout=120,
+                 network_capture=False, block_resources=None, page_load_strategy='normal'):
+        self.size = size
+        self.headless = headless
+        self.network_capture = network_capture
+        self.block_resources = block_resources
+        self.page_load_strategy = page_load_strategy
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+        self._started = False
+        self._stats = {'launched': 0, 'recycled': 0, 'discarded': 0, 'acquired': 0}
+
+    def start(self, background=True):
+        """Pre-launch drivers up to the pool size."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        atexit.register(self.close)
+
+        if background:
+            threading.Thread(target=self._fill, daemon=True).start()
+        else:
+            self._fill()
+
+    def _fill(self):
+        while not self._closed:
+            with self._lock:
+                if self._live >= self.size:
+                    return
+                self._live += 1
+            pooled = self._launch()
+            if pooled is None:
+                return
+            self._idle.put(pooled)
+
+    def _launch(self):
+        """Launch one driver. The caller must already have reserved a slot in '_live'."""
+        try:
+            pooled = PooledDriver(create_driver(headless=self.headless, network_capture=self.network_capture,
+                                                block_resources=self.block_resources,
+                                                page_load_strategy=self.page_load_strategy))
+            with self._lock:
+                self._stats['launched'] += 1
+            return pooled
+        except Exception as e:
+            print(f"[BrowserPool] Failed to launch browser: {e}")
+            with self._lock:
+                self._live -= 1
+            return None
+
+    def _is_healthy(self, pooled):
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _needs_recycle(self, pooled):
+        if self.max_pages and pooled.pages >= self.max_pages:
+            return True
+        if self.max_rss_mb:
+            rss = pooled.rss_mb()
+            if rss is not None and rss >= self.max_rss_mb:
+                return True
+        return False
+
+    def _reset(self, pooled):
+        """Return a driver to a clean single-tab state with no cookies or site storage."""
+        driver = pooled.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        if self.network_capture:
+            # Don't hand the next job this job's captured network events
+            driver.get_log('performance')
+        # delete_all_cookies() only covers the current page's domain; clear every domain's cookies,
+        # then the storage of the origins jobs visit. A failure here raises so release() retires
+        # the driver instead of handing the next job this one's session.
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        for origin in RESET_ORIGINS:
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                'origin': origin,
+                'storageTypes': 'local_storage,session_storage,indexeddb,service_workers,cache_storage'
+            })
+        driver.get('about:blank')
+
+    def _retire(self, pooled, reason):
+        pooled.quit()
+        with self._lock:
+            self._live -= 1
+            self._stats[reason] += 1
+        if not self._closed:
+            threading.Thread(target=self._fill, daemon=True).start()
+
+    def acquire(self, timeout=None):
+        """Check out a healthy driver, launching one if the pool has spare capacity."""
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        if not self._started:
+            self.start()
+
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                pooled = None
+                with self._lock:
+                    can_launch = self._live < self.size
+                    if can_launch:
+                        self._live += 1
+                if can_launch:
+                    pooled = self._launch()
+                    if pooled is None:
+                        raise RuntimeError("BrowserPool could not launch a browser")
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a pooled browser")
+                    try:
+                        pooled = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        raise TimeoutError("Timed out waiting for a pooled browser")
+
+            if self._is_healthy(pooled):
+                pooled.jobs += 1
+                with self._lock:
+                    self._stats['acquired'] += 1
+                return pooled
+            self._retire(pooled, 'discarded')
+
+    def release(self, pooled):
+        """Reset a driver and return it to the pool, or recycle it if it has worn out."""
+        if self._closed:
+            self._retire(pooled, 'discarded')
+            return
+
+        if self._needs_recycle(pooled):
+            self._retire(pooled, 'recycled')
+            return
+
+        try:
+            self._reset(pooled)
+        except Exception as e:
+            print(f"[BrowserPool] Could not reset browser, replacing it: {e}")
+            self._retire(pooled, 'discarded')
+            return
+        self._idle.put(pooled)
+
+    def discard(self, pooled):
+        """Quit a driver that is broken or was force-stopped, and launch a replacement."""
+        self._retire(pooled, 'discarded')
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['live'] = self._live
+        stats['idle'] = self._idle.qsize()
+        stats['size'] = self.size
+        return stats
+
+    def close(self):
+        """Quit every idle driver. Drivers still checked out are quit on release."""
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            pooled.quit()
+            with self._lock:
+                self._live -= 1
+
+
+def get_shared_pool(headless=True):
+    """
+    The process-wide warm single-browser pool the desktop GUIs reuse across runs;
+    asking for a different headless setting closes it and starts a new one.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool.headless != headless:
+            if _shared_pool:
+                _shared_pool.close()
+            _shared_pool = BrowserPool(size=1, headless=headless)
+            _shared_pool.start()
+        return _shared_pool
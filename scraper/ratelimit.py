@@ -0,0 +1,48 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class DomainRateLimiter:
+    """
+    Thread-safe token bucket per domain.
+
+    Allows 'rate' requests per second to each domain with bursts of up to
+    'burst' requests. Callers reserve a slot under the lock and sleep outside
+    it, so many workers can share one limiter without serializing on it.
+    """
+
+    def __init__(self, rate=2.0, burst=1, jitter=0.25):
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, domain):
+        """Take one token for 'domain' and return how long the caller must wait for it."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(domain, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate) - 1
+            self._buckets[domain] = (tokens, now)
+        return 0 if tokens >= 0 else -tokens / self.rate
+
+    def wait(self, url, should_stop=None):
+        """Block until a request to the URL's domain is allowed. Returns False if stopped while waiting."""
+        if not self.rate:
+            return True
+
+        delay = self._reserve(urlparse(url).netloc.lower())
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+
+        deadline = time.monotonic() + delay
+        while True:
+            if should_stop and should_stop():
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, 0.25))
@@ -0,0 +1,63 @@
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+
+# Readiness check per Maps page type, polled right after navigation. With the
+# eager / none page-load strategies driver.get() returns before the page is
+# usable, so these decide when the data we read is actually in the DOM.
+READY_CHECKS_JS = {
+    # Results feed with at least one card (or the end marker of an empty list)
+    'feed': """
+        const feed = document.querySelector("div[role='feed']");
+        return !!feed && !!(feed.querySelector("div[role='article']") || feed.querySelector('span.HlvSq'));
+    """,
+    # Place panel: name heading plus the address / phone / website action buttons
+    'detail': """
+        const h1 = document.querySelector('h1');
+        if (!h1 || !h1.textContent.trim()) return false;
+        return !!document.querySelector("button[data-item-id], a[data-item-id]");
+    """,
+}
+
+HEADING_JS = "const h1 = document.querySelector('h1'); return !!h1 && !!h1.textContent.trim();"
+
+# Set on the outgoing document before navigating, so a check can't pass on
+# the previous page while the new one hasn't replaced it yet
+MARK_STALE_JS = "window.__staleDocument = true;"
+_FRESH_GUARD = "if (window.__staleDocument) return false;\n"
+
+
+def mark_stale(driver):
+    try:
+        driver.execute_script(MARK_STALE_JS)
+    except WebDriverException:
+        pass
+
+
+def _wait(driver, script, timeout, poll):
+    def ready(driver):
+        try:
+            return driver.execute_script(_FRESH_GUARD + script)
+        except WebDriverException:
+            # The document is still being replaced (pageLoadStrategy 'none'); poll again
+            return False
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(ready)
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_until_ready(driver, page, timeout=10, settle=2, poll=0.1):
+    """
+    Block until the 'feed' or 'detail' readiness check passes; False on timeout.
+
+    For 'detail' the heading is waited for first, then the action buttons for
+    at most 'settle' seconds more, since some places have none at all.
+    """
+    if page == 'detail':
+        if not _wait(driver, HEADING_JS, timeout, poll):
+            return False
+        _wait(driver, READY_CHECKS_JS['detail'], settle, poll)
+        return True
+    return _wait(driver, READY_CHECKS_JS[page], timeout, poll)
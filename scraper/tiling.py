@@ -0,0 +1,190 @@
+import math
+import queue
+import re
+import threading
+from .cache import place_id_from_url
+
+
+# Maps URLs carry the viewport as /@lat,lng,zoomz
+VIEWPORT_RE = re.compile(r'@(-?\d+\.\d+),(-?\d+\.\d+),(\d+(?:\.\d+)?)z')
+
+# Browser window size (create_driver sets --window-size=1920,1080)
+VIEWPORT_PX = (1920, 1080)
+
+# A single Maps search stops at roughly this many listings
+RESULT_CAP = 120
+
+
+def parse_viewport(url):
+    """(lat, lng, zoom) from a Maps URL, or None."""
+    match = VIEWPORT_RE.search(url or '')
+    if not match:
+        return None
+    return float(match.group(1)), float(match.group(2)), float(match.group(3))
+
+
+def _degrees_per_px(zoom):
+    return 360.0 / (256 * 2 ** zoom)
+
+
+class Tile:
+    """A lat/lng box searched as one Maps viewport; 'depth' counts how often it was subdivided."""
+
+    def __init__(self, south, west, north, east, depth=0):
+        self.south, self.west, self.north, self.east = south, west, north, east
+        self.depth = depth
+
+    @classmethod
+    def around(cls, lat, lng, zoom, size=VIEWPORT_PX):
+        """The box a size[0] x size[1] px window shows centred on lat,lng at 'zoom'."""
+        half_lng = size[0] / 2 * _degrees_per_px(zoom)
+        half_lat = size[1] / 2 * _degrees_per_px(zoom) * math.cos(math.radians(lat))
+        return cls(lat - half_lat, lng - half_lng, lat + half_lat, lng + half_lng)
+
+    @property
+    def center(self):
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    def zoom(self, size=VIEWPORT_PX):
+        """Deepest whole zoom level at which the whole tile fits in the window."""
+        lat = self.center[0]
+        lng_zoom = math.log2(size[0] * 360.0 / (256 * (self.east - self.west)))
+        lat_zoom = math.log2(size[1] * 360.0 * math.cos(math.radians(lat)) / (256 * (self.north - self.south)))
+        return max(3, min(21, math.floor(min(lng_zoom, lat_zoom))))
+
+    def split(self, rows=2, cols=2):
+        """Subdivide into rows x cols child tiles, one level deeper."""
+        lat_step = (self.north - self.south) / rows
+        lng_step = (self.east - self.west) / cols
+        return [
+            Tile(self.south + r * lat_step, self.west + c * lng_step,
+                 self.south + (r + 1) * lat_step, self.west + (c + 1) * lng_step, self.depth + 1)
+            for r in range(rows) for c in range(cols)
+        ]
+
+    def __repr__(self):
+        lat, lng = self.center
+        return f"Tile({lat:.4f},{lng:.4f} z{self.zoom()} d{self.depth})"
+
+
+class GeoTiler:
+    """
+    Beats the ~120-listing cap of a single search by searching a location as
+    a grid of viewport tiles.
+
+    The location's own viewport (where Maps centres a search for it, read
+    from the engine's URL after engine.search()) is split into grid x grid
+    tiles, and each tile is searched as '/maps/search/<keyword>/@lat,lng,zoomz'.
+    Tiles are spread over the main engine plus up to 'workers' - 1 more from
+    'engine_factory'; if the factory fails (e.g. no pooled browser is free in
+    time) the tiler runs with fewer. A tile that comes back near the cap
+    ('dense_threshold' listings) is split into four and searched again, up to
+    'max_depth' levels. Listings are deduplicated across tiles by place ID.
+    """
+
+    def __init__(self, engine, keyword, location, max_results=1000, workers=1, engine_factory=None, grid=3,
+                 dense_threshold=100, max_depth=2, per_tile=RESULT_CAP, should_stop=None):
+        self.engine = engine
+        self.keyword = keyword
+        self.location = location
+        self.max_results = max_results
+        self.workers = max(1, workers)
+        self.engine_factory = engine_factory
+        self.grid = grid
+        self.dense_threshold = dense_threshold
+        self.max_depth = max_depth
+        self.per_tile = per_tile
+        self.should_stop = should_stop or (lambda: False)
+        self.cards = {}
+        self.stats = {'tiles': 0, 'subdivided': 0, 'duplicates': 0}
+        self._lock = threading.Lock()
+
+    def locate(self):
+        """
+        Viewport Maps picks for the location itself: read from the URL of the
+        search the engine already ran, searching only if that URL has none.
+        """
+        viewport = parse_viewport(self.engine.driver.current_url)
+        if viewport is None and self.engine.search(self.keyword, self.location):
+            viewport = parse_viewport(self.engine.driver.current_url)
+        return viewport
+
+    def _done(self):
+        return self.should_stop() or len(self.cards) >= self.max_results
+
+    def _search_tile(self, engine, tile):
+        lat, lng = tile.center
+        if not engine.search(self.keyword, self.location, at=(lat, lng, tile.zoom())):
+            return []
+        engine.scroll_and_collect(self.per_tile, should_stop=self.should_stop)
+        return engine.harvest_cards()
+
+    def _worker(self, engine, tiles):
+        while True:
+            tile = tiles.get()
+            if tile is None:
+                tiles.task_done()
+                return
+            try:
+                if self._done():
+                    continue
+                cards = self._search_tile(engine, tile)
+                with self._lock:
+                    self.stats['tiles'] += 1
+                    new = 0
+                    for card in cards:
+                        key = place_id_from_url(card['url'])
+                        if key in self.cards:
+                            self.stats['duplicates'] += 1
+                        else:
+                            self.cards[key] = card
+                            new += 1
+                    dense = len(cards) >= self.dense_threshold and tile.depth < self.max_depth
+                    if dense:
+                        self.stats['subdivided'] += 1
+                print(f"  {tile}: {len(cards)} listings, {new} new ({len(self.cards)} total)"
+                      f"{' -> subdividing' if dense else ''}")
+                if dense and not self._done():
+                    for child in tile.split():
+                        tiles.put(child)
+            except Exception as e:
+                print(f"  {tile}: tile search failed: {e}")
+            finally:
+                tiles.task_done()
+
+    def run(self):
+        """Search every tile and return the unique result cards (url, name, rating, ...)."""
+        viewport = self.locate()
+        if viewport is None:
+            print(f"Could not locate '{self.location}' on the map")
+            return []
+        root = Tile.around(*viewport)
+        tiles = queue.Queue()
+        for tile in root.split(self.grid, self.grid):
+            tiles.put(tile)
+        print(f"Tiling {self.location} into {self.grid}x{self.grid} tiles around {viewport[0]:.4f},{viewport[1]:.4f}")
+
+        engines = [self.engine]
+        for _ in range(self.workers - 1):
+            try:
+                engines.append(self.engine_factory())
+            except Exception as e:
+                print(f"Could not start extra tile worker: {e}")
+                break
+
+        threads = [threading.Thread(target=self._worker, args=(engine, tiles), daemon=True) for engine in engines]
+        for t in threads:
+            t.start()
+        try:
+            tiles.join()
+        finally:
+            for _ in threads:
+                tiles.put(None)
+            for t in threads:
+                t.join()
+            for engine in engines[1:]:
+                engine.close()
+
+        print(f"Tiling done: {len(self.cards)} unique listings from {self.stats['tiles']} tiles "
+              f"({self.stats['subdivided']} subdivided, {self.stats['duplicates']} duplicates)")
+        return list(self.cards.values())[:self.max_results]
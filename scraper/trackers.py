@@ -0,0 +1,82 @@
+import re
+
+
+# Tracker name -> literal signatures, written in lowercase because they are
+# matched against lowercased text. Each one is anchored to the tag's own
+# syntax (a script URL or API call), never a bare prefix like 'aw-' that
+# ordinary page text can contain. Add a signature here and it is picked up
+# by the single combined scan; no extra pass over the page.
+TRACKER_SIGNATURES = {
+    'Meta Pixel': ['connect.facebook.net', 'fbevents.js', 'fbq('],
+    'Google Analytics': ['google-analytics.com/analytics.js', 'google-analytics.com/ga.js', "ga('create'"],
+    'Google Analytics 4': ['gtag/js?id=g-', "'config', 'g-", '"config", "g-'],
+    'Google Tag Manager': ['googletagmanager.com/gtm.js', 'googletagmanager.com/ns.html'],
+    'Google Ads': ['googleadservices.com', 'googleads.g.doubleclick.net', 'gtag/js?id=aw-',
+                   "'config', 'aw-", '"config", "aw-', "send_to': 'aw-", 'send_to": "aw-'],
+    'Google Tag': ['gtag('],
+    'TikTok Pixel': ['analytics.tiktok.com', 'ttq.load(', 'ttq.page('],
+    'LinkedIn Insight': ['snap.licdn.com/li.lms-analytics', '_linkedin_partner_id'],
+    'Hotjar': ['static.hotjar.com', 'hjsitesettings'],
+    'Microsoft Clarity': ['clarity.ms/tag', '"clarity", "script"', "'clarity', 'script'"],
+    'Microsoft UET': ['bat.bing.com/bat.js', 'window.uetq', 'uetq.push('],
+    'Pinterest Tag': ['s.pinimg.com/ct/core.js', 'pintrk('],
+    'Snap Pixel': ['sc-static.net/scevent.min.js', 'snaptr('],
+    'X (Twitter) Pixel': ['static.ads-twitter.com/uwt.js', 'twq('],
+}
+
+# Which trackers count towards the legacy Yes/No pixel columns
+FACEBOOK_PIXELS = {'Meta Pixel'}
+GOOGLE_PIXELS = {'Google Analytics', 'Google Analytics 4', 'Google Tag Manager', 'Google Ads', 'Google Tag'}
+
+
+class TrackerDetector:
+    """
+    All tracker signatures compiled into one alternation, so a page is scanned
+    once no matter how many signatures exist.
+
+    Signatures are plain literals, longest first, and the pattern has no
+    groups: that keeps the regex engine on its literal-prefix fast path, which
+    named groups or IGNORECASE would knock it off (5-20x slower on a 1MB
+    page). Case is handled by lowercasing the content a 'chunk_size' window
+    at a time, so no lowercased copy of the whole page is made; windows
+    overlap by the longest signature so none is split. The matched text maps
+    straight back to its tracker.
+    """
+
+    def __init__(self, signatures=None, chunk_size=64 * 1024):
+        signatures = signatures or TRACKER_SIGNATURES
+        self.chunk_size = chunk_size
+        self._owners = {}
+        for name, literals in signatures.items():
+            for literal in literals:
+                self._owners[literal] = name
+        ordered = sorted(self._owners, key=len, reverse=True)
+        self._text_pattern = re.compile('|'.join(re.escape(s) for s in ordered))
+        self._bytes_pattern = re.compile(b'|'.join(re.escape(s.encode('ascii')) for s in ordered))
+        self._overlap = max(len(s) for s in ordered) - 1
+        self._total = len(signatures)
+
+    def detect(self, content):
+        """Return the set of tracker names found in 'content' (str or bytes)."""
+        is_bytes = isinstance(content, (bytes, bytearray))
+        pattern = self._bytes_pattern if is_bytes else self._text_pattern
+        found = set()
+        for start in range(0, len(content), self.chunk_size):
+            window = content[start:start + self.chunk_size + self._overlap].lower()
+            for match in pattern.finditer(window):
+                literal = match.group(0)
+                found.add(self._owners[literal.decode('ascii') if is_bytes else literal])
+                if len(found) == self._total:
+                    return found
+        return found
+
+
+_default_detector = None
+
+
+def detect_trackers(content):
+    """Scan a page once with the default signature registry."""
+    global _default_detector
+    if _default_detector is None:
+        _default_detector = TrackerDetector()
+    return _default_detector.detect(content)
@@ -131,7 +131,7 @@ function updateStats() {
             }
 
             // Check for completion
-            if (data.status === 'Completed' || data.status === 'Error') {
+            if (data.status === 'Completed' || data.status === 'Error' || data.status === 'Aborted') {
                 if (data.status === 'Completed') {
                     addLog('Mission Accomplished! Data exported.', 'success');
                 }
@@ -198,19 +198,6 @@ function startScraping() {
     if (terminal) terminal.innerHTML = '';
     addLog('Initializing mission parameters...', 'system');
 
-    // Start Log Stream
-    if (logSource) logSource.close();
-    logSource = new EventSource('/api/logs');
-    logSource.onmessage = function (event) {
-        if (event.data) {
-            addLog(event.data, 'info');
-        }
-    };
-
-    // Start Stats Polling
-    if (statsInterval) clearInterval(statsInterval);
-    statsInterval = setInterval(updateStats, 2000);
-
     // API Call with no_website flag
     fetch('/api/start', {
         method: 'POST',
@@ -228,7 +215,24 @@ function startScraping() {
             if (data.error) {
                 addLog(data.error, 'error');
                 resetUI();
+                return;
             }
+            if (data.position > 0) {
+                addLog(`Mission queued (position ${data.position})`, 'system');
+            }
+
+            // Stream this job's log
+            if (logSource) logSource.close();
+            logSource = new EventSource(`/api/jobs/${data.job_id}/logs`);
+            logSource.onmessage = function (event) {
+                if (event.data) {
+                    addLog(event.data, 'info');
+                }
+            };
+
+            // Start Stats Polling (once the session points at the new job)
+            if (statsInterval) clearInterval(statsInterval);
+            statsInterval = setInterval(updateStats, 2000);
         })
         .catch(error => {
             addLog('Connection error: ' + error, 'error');
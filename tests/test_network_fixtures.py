@@ -0,0 +1,49 @@
+import glob
+import os
+
+from scraper.network import listing_key, parse_payload
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, 'fixtures', 'maps')
+
+
+def parse_fixtures():
+    places = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, '*.txt'))):
+        kind = '/maps/preview/place' if os.path.basename(path).startswith('place') else '/search?tbm=map'
+        with open(path, encoding='utf-8') as f:
+            places[os.path.basename(path)] = parse_payload(kind, f.read(), 'dentist', 'Boston, MA')
+    return places
+
+
+def test_fixture_listing_counts():
+    places = parse_fixtures()
+    assert {name: len(found) for name, found in places.items()} == {
+        'place_beacon_hill_family_dental.txt': 1,
+        'search_dentist_boston.txt': 4,
+        'search_dentist_boston_page2.txt': 4,
+    }
+    unique = {listing_key(url, record) for found in places.values() for url, record in found}
+    assert len(unique) == 7
+
+
+def test_fixture_fields():
+    records = {record['Business Name']: (url, record) for found in parse_fixtures().values() for url, record in found}
+
+    url, record = records['Beacon Hill Family Dental']
+    assert '!1s0x89e3709b2b1f2a3d:0x5c1e0f6a9b0c1d2e' in url and url.endswith('!19sChIJPQrxspBw44kRLh0MmWoPHlw')
+    assert record['Category'] == 'Dentist'
+    assert (record['Rating'], record['Reviews']) == ('4.8', '312')
+    assert record['Website'] == 'https://www.beaconhilldental.example/'
+    assert record['Phone'] == '(617) 555-0142'
+    assert record['Address'] == '12 Charles St, Boston, MA 02114'
+    assert record['Coordinates'] == '42.3581, -71.0707'
+    assert record['Business_Hours'].startswith('Monday: 8 AM')
+    assert (record['Keyword'], record['City']) == ('dentist', 'Boston, MA')
+
+    # A listing without a ChIJ ID still gets a URL from its feature ID
+    url, record = records['Harbor Dental Associates']
+    assert '!19s' not in url and record['Website'] == ''
+
+    # Missing rating / phone come back empty rather than failing the listing
+    _, record = records['North End Dental Care']
+    assert (record['Rating'], record['Reviews'], record['Phone']) == ('', '', '')
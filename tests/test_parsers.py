@@ -0,0 +1,33 @@
+import pytest
+
+from scraper.parsers import PARSER_BACKENDS, summarize
+
+PAGE = """<!DOCTYPE html>
+<html>
+<HEAD>
+  <TITLE>Acme Dental</TITLE>
+  <META NAME="Description" CONTENT="Family dentistry in Boston">
+  <meta name="VIEWPORT" content="width=device-width">
+</HEAD>
+<body>
+  <A HREF="/contact">Contact</A>
+  <a href="https://acme.example/about">About</a>
+</body>
+</html>
+"""
+
+
+@pytest.mark.parametrize('backend', sorted(PARSER_BACKENDS))
+def test_mixed_case_page(backend):
+    summary = summarize(PAGE, backend)
+    assert summary.title == 'Acme Dental'
+    assert summary.description == 'Family dentistry in Boston'
+    assert summary.has_viewport
+    assert summary.links == ['/contact', 'https://acme.example/about']
+
+
+def test_backends_agree():
+    pytest.importorskip('selectolax')
+    summaries = [summarize(PAGE, backend) for backend in sorted(PARSER_BACKENDS)]
+    assert len(summaries) == 3
+    assert len({(s.title, s.description, s.has_viewport, tuple(s.links)) for s in summaries}) == 1
@@ -0,0 +1,97 @@
+import threading
+
+from scraper.journal import JobJournal
+from scraper.pipeline import ScrapePipeline
+
+
+def place_url(n):
+    return f"https://www.google.com/maps/place/Place+{n}/data=!4m2!3m1!1s0x1:0x{n:x}"
+
+
+def record(url):
+    return {'Business Name': url.rsplit('0x', 1)[-1], 'Address': '', 'Website': '', 'url': url}
+
+
+class FakeEngine:
+    """Just enough of ScraperEngine for ScrapePipeline: a fixed result list and instant place pages."""
+
+    extraction = 'dom'
+    detail_workers = 2
+
+    def __init__(self, urls, hold_after=None, stopped=None):
+        self.urls = urls
+        self.hold_after = hold_after
+        self.stopped = stopped
+        self.fetched = []
+
+    def stream_cards(self, max_results=20, should_stop=None):
+        for n, url in enumerate(self.urls[:max_results]):
+            if n == self.hold_after:
+                # The feed is still scrolling when the job is stopped
+                self.stopped.wait(5)
+                return
+            yield {'url': url}
+
+    def collect_network_places(self, keyword, location, max_results, should_stop=None):
+        return [(url, record(url)) for url in self.urls[:max_results]]
+
+    def checkout_workers(self, count):
+        return [object() for _ in range(count)]
+
+    def return_workers(self, leases):
+        pass
+
+    def fetch_details(self, url, keyword, location, should_stop=None, lease=None):
+        self.fetched.append(url)
+        return record(url)
+
+
+def test_resume_after_stop_mid_collection(tmp_path):
+    journal = JobJournal(str(tmp_path / 'jobs.db'))
+    job_id = journal.create_job('dentist', 'boston', 10)
+    urls = [place_url(n) for n in range(10)]
+
+    stopped = threading.Event()
+    first = FakeEngine(urls, hold_after=6, stopped=stopped)
+
+    def on_record(business):
+        if len(journal.records(job_id)) >= 4:
+            stopped.set()
+
+    ScrapePipeline(first, 'dentist', 'boston', 10, should_stop=stopped.is_set, on_record=on_record,
+                   journal=journal, job_id=job_id).run()
+    done = journal.records(job_id)
+    assert done and journal.urls(job_id) is None
+    collected = journal.collected_urls(job_id)
+    assert all(collected[index] == business['url'] for index, business in done.items())
+
+    # The same search comes back in another order
+    second = FakeEngine(list(reversed(urls)))
+    results = ScrapePipeline(second, 'dentist', 'boston', 10, journal=journal, job_id=job_id).run()
+
+    assert sorted(business['url'] for business in results) == sorted(urls)
+    assert not set(second.fetched) & {business['url'] for business in done.values()}
+    assert len(journal.urls(job_id)) == 10
+    journal.close()
+
+
+def test_network_resume_matches_listings_by_place(tmp_path):
+    journal = JobJournal(str(tmp_path / 'jobs.db'))
+    job_id = journal.create_job('dentist', 'boston', 5)
+    urls = [place_url(n) for n in range(5)]
+    # The first run finished two listings, one of them without a place URL in its payload
+    journal.add_url(job_id, 0, urls[3])
+    journal.save_record(job_id, 0, record(urls[3]))
+    journal.add_url(job_id, 1, '')
+    journal.save_record(job_id, 1, dict(record(urls[1]), url=''))
+
+    engine = FakeEngine([])
+    engine.extraction = 'network'
+    engine.collect_network_places = lambda *args, **kwargs: (
+        [(url, record(url)) for url in urls if url != urls[1]] + [('', dict(record(urls[1]), url=''))])
+
+    results = ScrapePipeline(engine, 'dentist', 'boston', 5, journal=journal, job_id=job_id).run()
+
+    assert len(results) == 5
+    assert sorted(business['Business Name'] for business in results) == sorted(record(url)['Business Name'] for url in urls)
+    journal.close()